@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Framework agent extractors for parse_crewai_repos.py.
+
+Each supported framework registers an AgentExtractor: the constructors that
+build its agents (fully qualified, as the file's imports resolve them) and
+the keyword or positional arguments its role, goal, LLM, tools and name are
+passed as. Selected extractors (--extractor, default: crewai) are combined
+into an ExtractorSet, a single qualname -> extractor dict, and one
+ExtractionVisitor pass per file both records the file's bindings and
+dispatches every call to the extractor of its constructor. Adding frameworks
+adds dict entries, not traversals: a file is parsed and walked once however
+many are enabled.
+
+Field extraction runs after the pass, once the file's bindings are complete,
+and only on the matched calls. The extractor returns AST nodes or plain
+strings; parse_crewai_repos.py turns them into the report's role, goal, llm
+and tools_used as it does for CrewAI.
+
+CrewAI agents of @CrewBase projects are built from YAML:
+
+  agents_config = 'config/agents.yaml'
+  @agent
+  def researcher(self) -> Agent:
+      return Agent(config=self.agents_config['researcher'], tools=[...])
+
+The file's agents_config (default 'config/agents.yaml', relative to the
+file's directory, as CrewBase resolves it) is loaded, and role, goal and llm
+not passed in code are taken from the entry. Loading needs PyYAML; without
+it such agents keep only what the code passes. Each config read is recorded
+with its content hash, so cached agents are reused only while it is
+unchanged.
+"""
+
+import ast
+import hashlib
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from import_graph import binding_for_value, dotted_name, import_bindings
+from readme_index import ALL_FRAMEWORKS, framework_key
+
+try:
+    import yaml
+except ImportError:  # optional: only needed for @CrewBase YAML agent configs
+    yaml = None
+
+
+DEFAULT_EXTRACTORS = ('crewai',)
+DEFAULT_AGENTS_CONFIG = 'config/agents.yaml'
+
+FieldValue = Union[ast.AST, str, None]
+
+
+@dataclass
+class AgentFields:
+    """One agent's fields as found in the source: AST nodes, or strings read from a config."""
+    name: Optional[str] = None  # used when the call is not assigned or returned
+    role: FieldValue = None
+    goal: FieldValue = None
+    llm: FieldValue = None
+    tools: Optional[ast.AST] = None
+
+
+@dataclass
+class ExtractionContext:
+    """What field extractors may use besides the call: the file and its bindings."""
+    src: str
+    file_path: Optional[Path]
+    values: Dict[str, ast.AST]
+    configs: Dict[str, str] = field(default_factory=dict)  # config path -> sha256 of every config read
+
+    def load_config(self, path: Path) -> Optional[dict]:
+        mapping, digest = load_agent_config(path)
+        self.configs[str(path)] = digest
+        return mapping
+
+
+@dataclass(frozen=True)
+class AgentExtractor:
+    """A framework's agent constructors and where each report field is passed.
+
+    Fields name the keywords to look for, in priority order; positional names
+    the fields of the leading positional arguments. bare_names are matched by
+    name alone, whatever the file imports.
+    """
+    framework: str
+    constructors: Tuple[str, ...]
+    markers: Tuple[str, ...]  # substrings every file constructing one contains
+    role: Tuple[str, ...] = ()
+    goal: Tuple[str, ...] = ()
+    llm: Tuple[str, ...] = ()
+    tools: Tuple[str, ...] = ()
+    name: Tuple[str, ...] = ()
+    positional: Tuple[str, ...] = ()
+    bare_names: Tuple[str, ...] = ()
+
+    def argument(self, call: ast.Call, field_name: str) -> Optional[ast.AST]:
+        names = getattr(self, field_name)
+        for kw in call.keywords:
+            if kw.arg in names:
+                return kw.value
+        if field_name in self.positional:
+            i = self.positional.index(field_name)
+            if i < len(call.args) and not any(isinstance(a, ast.Starred) for a in call.args[:i + 1]):
+                return call.args[i]
+        return None
+
+    def fields(self, call: ast.Call, ctx: ExtractionContext) -> AgentFields:
+        name = self.argument(call, 'name')
+        return AgentFields(
+            name=name.value if isinstance(name, ast.Constant) and isinstance(name.value, str) else None,
+            role=self.argument(call, 'role'),
+            goal=self.argument(call, 'goal'),
+            llm=self.argument(call, 'llm'),
+            tools=self.argument(call, 'tools'),
+        )
+
+
+@dataclass(frozen=True)
+class CrewAIExtractor(AgentExtractor):
+    def fields(self, call: ast.Call, ctx: ExtractionContext) -> AgentFields:
+        fields = super().fields(call, ctx)
+        entry = None
+        for kw in call.keywords:
+            if kw.arg == 'config':
+                entry = crewbase_agent_entry(kw.value, ctx)
+        if entry:
+            # Arguments passed in code take precedence over the config
+            for name in ('role', 'goal', 'llm'):
+                if getattr(fields, name) is None and isinstance(entry.get(name), str):
+                    setattr(fields, name, entry[name].strip())
+        return fields
+
+
+def crewbase_agent_entry(node: ast.AST, ctx: ExtractionContext) -> Optional[dict]:
+    """The agents.yaml entry of config=self.agents_config['key'], if it can be loaded."""
+    if not (isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)):
+        return None
+    config_name = dotted_name(node.value)
+    if config_name is None or config_name.rsplit('.', 1)[-1] != 'agents_config' or ctx.file_path is None:
+        return None
+    path_node = ctx.values.get('agents_config')
+    rel = path_node.value if isinstance(path_node, ast.Constant) and isinstance(path_node.value, str) else DEFAULT_AGENTS_CONFIG
+    mapping = ctx.load_config(ctx.file_path.parent / rel)
+    entry = mapping.get(node.slice.value) if mapping is not None else None
+    return entry if isinstance(entry, dict) else None
+
+
+def config_digest(path: Path) -> str:
+    """sha256 of a config file's content; '' if it cannot be read."""
+    return load_agent_config(path)[1]
+
+
+def load_agent_config(path: Path) -> Tuple[Optional[dict], str]:
+    """(mapping, sha256) of a YAML agents config, reused while its mtime and size are unchanged.
+
+    The mapping is None if the file cannot be read or parsed, or PyYAML is
+    missing; the digest is '' if it cannot be read. The mapping is shared
+    between callers and must not be modified.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return None, ''
+    return _agent_config(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _agent_config(path: str, mtime_ns: int, size: int) -> Tuple[Optional[dict], str]:
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None, ''
+    digest = hashlib.sha256(data).hexdigest()
+    if yaml is None:
+        return None, digest
+    try:
+        mapping = yaml.safe_load(data)
+    except yaml.YAMLError:
+        return None, digest
+    return (mapping if isinstance(mapping, dict) else None), digest
+
+
+EXTRACTORS: Dict[str, AgentExtractor] = {}
+
+
+def register(extractor: AgentExtractor) -> AgentExtractor:
+    EXTRACTORS[framework_key(extractor.framework)] = extractor
+    return extractor
+
+
+register(CrewAIExtractor(
+    framework='crewai',
+    constructors=('crewai.Agent',),
+    # A bare Agent(...) is taken to be crewai's, imported or not
+    bare_names=('Agent',),
+    markers=('Agent',),
+    role=('role',),
+    goal=('goal',),
+    llm=('llm', 'model'),
+    tools=('tools', 'tool', 'toolkit'),
+))
+
+register(AgentExtractor(
+    framework='langgraph',
+    constructors=('langgraph.prebuilt.create_react_agent', 'langgraph.prebuilt.chat_agent_executor.create_react_agent'),
+    markers=('create_react_agent',),
+    goal=('prompt', 'state_modifier', 'messages_modifier'),
+    llm=('model',),
+    tools=('tools',),
+    name=('name',),
+    positional=('llm', 'tools'),
+))
+
+register(AgentExtractor(
+    framework='autogen',
+    constructors=(
+        'autogen_agentchat.agents.AssistantAgent',
+        'autogen.AssistantAgent', 'autogen.agentchat.AssistantAgent',
+        'autogen.ConversableAgent', 'autogen.agentchat.ConversableAgent',
+    ),
+    markers=('Agent',),
+    role=('description',),
+    goal=('system_message',),
+    llm=('model_client', 'llm_config'),
+    tools=('tools',),
+    name=('name',),
+    positional=('name',),
+))
+
+
+def registered_markers() -> Tuple[str, ...]:
+    """Markers of every registered extractor, whether selected or not."""
+    return tuple(dict.fromkeys(m for e in EXTRACTORS.values() for m in e.markers))
+
+
+class ExtractorSet:
+    """Selected extractors indexed by the constructor names they match."""
+
+    def __init__(self, extractors: Iterable[AgentExtractor]) -> None:
+        self.extractors = tuple(extractors)
+        self.names = tuple(e.framework for e in self.extractors)
+        self.by_qualname: Dict[str, AgentExtractor] = {}
+        self.by_bare_name: Dict[str, AgentExtractor] = {}
+        for e in self.extractors:
+            for q in e.constructors:
+                self.by_qualname.setdefault(q, e)
+            for n in e.bare_names:
+                self.by_bare_name.setdefault(n, e)
+
+    def match(self, func: ast.AST, import_aliases: Dict[str, str]) -> Optional[AgentExtractor]:
+        """Extractor of a call's func: Name(alias) or alias.Attr resolved through the file's imports."""
+        if isinstance(func, ast.Name):
+            extractor = self.by_qualname.get(import_aliases.get(func.id, func.id))
+            return extractor if extractor is not None else self.by_bare_name.get(func.id)
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            mod = import_aliases.get(func.value.id, func.value.id)
+            return self.by_qualname.get(f"{mod}.{func.attr}")
+        return None
+
+
+@lru_cache(maxsize=16)
+def extractor_set(frameworks: Tuple[str, ...] = DEFAULT_EXTRACTORS) -> ExtractorSet:
+    """ExtractorSet of --extractor names ('all' for every one), matched like --framework names.
+
+    Raises ValueError for a name no extractor is registered for.
+    """
+    selected: List[AgentExtractor] = []
+    for name in frameworks:
+        if name.lower() == ALL_FRAMEWORKS:
+            found = list(EXTRACTORS.values())
+        elif framework_key(name) in EXTRACTORS:
+            found = [EXTRACTORS[framework_key(name)]]
+        else:
+            raise ValueError(f"no agent extractor for framework {name!r}; extractors: {', '.join(EXTRACTORS)}")
+        selected.extend(e for e in found if e not in selected)
+    return ExtractorSet(selected)
+
+
+class DeadlinePassed(Exception):
+    pass
+
+
+class ExtractionVisitor:
+    """Single pass collecting a file's agent constructor calls and its bindings.
+
+    matches lists each call an extractor claims, with that extractor, in
+    source order. names maps each Call node to the name it is bound to, if
+    any; assignments at any depth and returns from functions count:
+      researcher = Agent(...)          => 'researcher'
+      writer: Agent = Agent(...)       => 'writer'
+      self.analyst = Agent(...)        => 'analyst'
+      def researcher(self):
+          return Agent(...)            => 'researcher'
+
+    The same pass records the file's name and self.attr bindings at any depth
+    for tool and LLM resolution: bindings in import_graph's format (assignments
+    and imports), values as the assigned expressions. A name bound more than
+    once keeps its last binding.
+
+    The tree is walked depth first with an explicit stack rather than by
+    recursion (as ast.NodeVisitor does), so deeply nested expressions that
+    ast.parse accepts, e.g. a long chain of '+', cannot hit the recursion
+    limit.
+
+    Raises DeadlinePassed once deadline (a time.time() value) has passed.
+    """
+
+    def __init__(self, module: str = '', extractors: Optional[ExtractorSet] = None, import_aliases: Optional[Dict[str, str]] = None, deadline: Optional[float] = None) -> None:
+        self.names: Dict[ast.Call, str] = {}
+        self.bindings: Dict[str, list] = {}
+        self.values: Dict[str, ast.AST] = {}
+        self.matches: List[Tuple[ast.Call, AgentExtractor]] = []
+        self._module = module
+        self._extractors = extractors
+        self._import_aliases = import_aliases or {}
+        self._deadline = deadline
+
+    def _bind(self, value: Optional[ast.AST], target: ast.AST) -> None:
+        key = dotted_name(target)
+        if value is not None and key is not None and (isinstance(target, ast.Name) or key.count('.') == 1 and key.startswith('self.')):
+            self.values[key] = value
+            binding = binding_for_value(value)
+            if binding is not None:
+                self.bindings[key] = binding
+        if not isinstance(value, ast.Call):
+            return
+        if isinstance(target, ast.Name):
+            self.names[value] = target.id
+        elif isinstance(target, ast.Attribute):
+            self.names[value] = target.attr
+
+    def visit(self, tree: ast.AST) -> None:
+        # (node, name of the innermost enclosing function or None), in pre-order
+        stack: List[Tuple[ast.AST, Optional[str]]] = [(tree, None)]
+        while stack:
+            node, function = stack.pop()
+            if isinstance(node, ast.Call):
+                if self._deadline is not None and time.time() > self._deadline:
+                    raise DeadlinePassed()
+                if self._extractors is not None:
+                    extractor = self._extractors.match(node.func, self._import_aliases)
+                    if extractor is not None:
+                        self.matches.append((node, extractor))
+            elif isinstance(node, ast.Assign):
+                # In reverse so the first target names the Call: 'a = b = Agent(...)' => 'a'
+                for target in reversed(node.targets):
+                    self._bind(node.value, target)
+            elif isinstance(node, ast.AnnAssign):
+                self._bind(node.value, node.target)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                for name, binding in import_bindings(node, self._module):
+                    if name != '*':
+                        self.bindings[name] = binding
+                continue
+            elif isinstance(node, ast.Return):
+                if isinstance(node.value, ast.Call) and function is not None:
+                    self.names[node.value] = function
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                function = node.name
+            children = list(ast.iter_child_nodes(node))
+            stack.extend((child, function) for child in reversed(children))
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for parse_crewai_repos.py and clone_crewai_repos.py.
+
+Generates a synthetic CrewAI corpus (deterministic for a given --seed) and
+times each pipeline stage:
+  - iter_python_files, build_repo_symbol_index, parse_repo on one repo
+  - parse_all end to end over the whole corpus (serial and with --jobs)
+  - clone_all against local bare repos served as file:// URLs, each with a
+    large binary asset, as full clones and as --sparse clones
+  - micro-benchmarks on generated in-memory data: resolve_symbol_in_repo
+    over a --micro-defs definition index, by linear suffix scan and through
+    the short-name index, and the traced memory of --micro-tool-refs tool
+    references held as slotted records and as report dicts
+
+Each synthetic repo mixes agent modules (Agent(...) calls with crewai_tools and
+in-repo tools), tool modules (@tool functions and BaseTool subclasses), filler
+modules, files with syntax errors and a deep package tree.
+
+Results are printed and can be saved as JSON (--out) and compared against an
+earlier run (--compare).
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import clone_crewai_repos
+import parse_crewai_repos
+
+
+EXTERNAL_TOOLS = [
+    'SerperDevTool', 'ScrapeWebsiteTool', 'FileReadTool', 'DirectoryReadTool',
+    'WebsiteSearchTool', 'CodeDocsSearchTool', 'YoutubeVideoSearchTool',
+]
+MODELS = ['gpt-4o', 'claude-3-opus', 'gemini-pro', 'llama3', 'mistral-large', 'custom-model']
+
+
+def tool_module_source(rng: random.Random, index: int, tools_per_module: int) -> str:
+    lines = ['from crewai.tools import tool', 'from crewai_tools import BaseTool', '']
+    for t in range(tools_per_module):
+        if rng.random() < 0.5:
+            lines += [
+                f'@tool("Tool {index}_{t}")',
+                f'def tool_{index}_{t}(query: str) -> str:',
+                f'    """Function tool {index}_{t}."""',
+                '    return query',
+                '',
+            ]
+        else:
+            lines += [
+                f'class Tool{index}x{t}(BaseTool):',
+                f'    """Class tool {index}_{t}."""',
+                f'    name: str = "tool_{index}_{t}"',
+                '',
+                '    def _run(self, query: str) -> str:',
+                '        return query',
+                '',
+            ]
+    return '\n'.join(lines) + '\n'
+
+
+def agent_module_source(rng: random.Random, agents: int, tool_names: List[str], tool_module: Optional[str]) -> str:
+    used_external = rng.sample(EXTERNAL_TOOLS, k=3)
+    lines = [
+        'from crewai import Agent, Crew, Task',
+        f"from crewai_tools import {', '.join(used_external)}",
+    ]
+    if tool_module and tool_names:
+        lines.append(f"from {tool_module} import {', '.join(tool_names)}")
+    lines += ['', 'search_tool = SerperDevTool()', '']
+    for a in range(agents):
+        tools = [f'{rng.choice(used_external)}()', 'search_tool']
+        if tool_names:
+            ref = rng.choice(tool_names)
+            tools.append(f'{ref}()' if ref[0].isupper() else ref)
+        lines += [
+            f'agent_{a} = Agent(',
+            f'    role="Role {a}",',
+            f'    goal="Goal {a} for the synthetic benchmark",',
+            f'    backstory="Backstory {a}",',
+            f'    llm="{rng.choice(MODELS)}",',
+            f"    tools=[{', '.join(tools)}],",
+            ')',
+            '',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def filler_module_source(rng: random.Random, index: int) -> str:
+    lines = ['import os', '']
+    for f in range(rng.randint(2, 8)):
+        lines += [
+            f'def helper_{index}_{f}(x):',
+            f'    """Helper {f}."""',
+            '    return [os.path.join(str(i), str(x)) for i in range(10)]',
+            '',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_repo(
+    repo_dir: Path,
+    files: int,
+    agents: int,
+    seed: int = 0,
+    syntax_error_ratio: float = 0.02,
+    depth: int = 6,
+) -> Dict[str, int]:
+    """Write one synthetic repo; returns counts of what was generated."""
+    rng = random.Random(seed)
+    repo_dir.mkdir(parents=True, exist_ok=True)
+
+    tool_files = max(1, files // 10)
+    agent_files = max(1, min(files // 5, agents))
+    broken_files = int(files * syntax_error_ratio)
+    filler_files = max(0, files - tool_files - agent_files - broken_files)
+
+    # Nest a chain of packages so the walker has to descend deep trees.
+    deep = repo_dir.joinpath(*[f'level{i}' for i in range(depth)])
+    deep.mkdir(parents=True, exist_ok=True)
+    for i in range(depth + 1):
+        pkg = repo_dir.joinpath(*[f'level{j}' for j in range(i)])
+        (pkg / '__init__.py').touch()
+
+    tool_names_by_module: Dict[str, List[str]] = {}
+    for i in range(tool_files):
+        src = tool_module_source(rng, i, tools_per_module=4)
+        (repo_dir / 'tools').mkdir(exist_ok=True)
+        (repo_dir / 'tools' / f'custom_tools_{i}.py').write_text(src)
+        names = [line.split()[1].split('(')[0] for line in src.splitlines() if line.startswith(('def ', 'class '))]
+        tool_names_by_module[f'tools.custom_tools_{i}'] = names
+
+    agents_left = agents
+    for i in range(agent_files):
+        count = agents_left // (agent_files - i)
+        agents_left -= count
+        module = rng.choice(sorted(tool_names_by_module))
+        names = rng.sample(tool_names_by_module[module], k=min(2, len(tool_names_by_module[module])))
+        target = deep if i % 3 == 0 else repo_dir / 'agents'
+        target.mkdir(exist_ok=True)
+        (target / f'crew_{i}.py').write_text(agent_module_source(rng, count, names, module))
+
+    for i in range(filler_files):
+        target = repo_dir / 'lib' / f'pkg{i % 20}'
+        target.mkdir(parents=True, exist_ok=True)
+        (target / f'module_{i}.py').write_text(filler_module_source(rng, i))
+
+    for i in range(broken_files):
+        (repo_dir / f'broken_{i}.py').write_text('def broken(:\n    pass\n')
+
+    return {
+        'tool_files': tool_files,
+        'agent_files': agent_files,
+        'filler_files': filler_files,
+        'broken_files': broken_files,
+        'agents': agents,
+    }
+
+
+def generate_corpus(root: Path, repos: int, files: int, agents: int, seed: int = 0) -> None:
+    for r in range(repos):
+        generate_repo(root / f'synthetic-repo-{r:03d}', files=files, agents=agents, seed=seed + r)
+
+
+def make_bare_repos(root: Path, count: int, files: int, seed: int = 0, blob_bytes: int = 0) -> List[str]:
+    """Create local bare repos under root/mirrors/<owner>/ and return their file:// URLs.
+
+    With blob_bytes, each repo also commits an incompressible assets/model.bin
+    of that size, which --sparse clones never fetch.
+    """
+    urls: List[str] = []
+    env_args = ['-c', 'user.name=bench', '-c', 'user.email=bench@example.invalid']
+    for r in range(count):
+        work = root / 'work' / f'repo{r}'
+        generate_repo(work, files=files, agents=max(1, files // 10), seed=seed + r)
+        if blob_bytes:
+            (work / 'assets').mkdir(exist_ok=True)
+            (work / 'assets' / 'model.bin').write_bytes(random.Random(seed + r).randbytes(blob_bytes))
+        subprocess.run(['git', 'init', '-q', str(work)], check=True)
+        subprocess.run(['git', '-C', str(work), 'add', '-A'], check=True)
+        subprocess.run(['git', '-C', str(work), *env_args, 'commit', '-q', '-m', 'synthetic'], check=True)
+        bare = root / 'mirrors' / 'bench' / f'repo{r}.git'
+        bare.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(['git', 'clone', '-q', '--bare', str(work), str(bare)], check=True)
+        # file:// remotes only honour --filter=blob:none when the server allows it (as GitHub does)
+        subprocess.run(['git', '-C', str(bare), 'config', 'uploadpack.allowFilter', 'true'], check=True)
+        urls.append(bare.as_uri())
+    return urls
+
+
+def time_it(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min': min(samples), 'median': statistics.median(samples)}
+
+
+def with_throughput(timing: Dict[str, float], files: int, agents: int) -> dict:
+    best = timing['min'] or 1e-9
+    return {**timing, 'files_per_sec': files / best, 'agents_per_sec': agents / best}
+
+
+def run_parser_benchmarks(corpus: Path, repeat: int, jobs: int) -> dict:
+    repo = sorted(p for p in corpus.iterdir() if p.is_dir())[0]
+    repo_files = len(list(parse_crewai_repos.iter_python_files(repo)))
+    repo_agents = len(parse_crewai_repos.parse_repo(repo)[0])
+    full = parse_crewai_repos.parse_all(corpus, overall_timeout_sec=10 ** 9)
+    corpus_files = sum(len(list(parse_crewai_repos.iter_python_files(p))) for p in corpus.iterdir() if p.is_dir())
+    corpus_agents = full['stats']['agents_found']
+
+    results = {
+        'iter_python_files': with_throughput(
+            time_it(lambda: list(parse_crewai_repos.iter_python_files(repo)), repeat), repo_files, repo_agents),
+        'build_repo_symbol_index': with_throughput(
+            time_it(lambda: parse_crewai_repos.build_repo_symbol_index(repo), repeat), repo_files, repo_agents),
+        'parse_repo': with_throughput(
+            time_it(lambda: parse_crewai_repos.parse_repo(repo), repeat), repo_files, repo_agents),
+        'parse_all': with_throughput(
+            time_it(lambda: parse_crewai_repos.parse_all(corpus, overall_timeout_sec=10 ** 9), repeat),
+            corpus_files, corpus_agents),
+    }
+    if jobs > 1:
+        results[f'parse_all_jobs{jobs}'] = with_throughput(
+            time_it(lambda: parse_crewai_repos.parse_all(corpus, overall_timeout_sec=10 ** 9, jobs=jobs), repeat),
+            corpus_files, corpus_agents)
+    return results
+
+
+def synthetic_definitions(count: int, per_module: int = 20) -> Dict[str, 'parse_crewai_repos.DefinitionInfo']:
+    """qualname -> definition for count top-level definitions, per_module to a module."""
+    index = {}
+    for i in range(count):
+        module = f'pkg.sub{i // per_module % 50}.mod{i // per_module}'
+        name = f'tool_{i}' if i % 2 else f'Tool{i}'
+        qual = f'{module}.{name}'
+        index[qual] = parse_crewai_repos.DefinitionInfo(
+            name=name, kind='function' if i % 2 else 'class', module=module,
+            file_path=f'/repo/{module.replace(".", "/")}.py', doc_first_line=None, qualname=qual,
+        )
+    return index
+
+
+def run_micro_benchmarks(defs: int, repeat: int, lookups: int = 1000) -> dict:
+    results: Dict[str, dict] = {}
+    if defs > 0:
+        qual_index = synthetic_definitions(defs)
+        name_index = parse_crewai_repos.build_name_index(qual_index)
+        rng = random.Random(0)
+        names = [d.name for d in rng.sample(list(qual_index.values()), k=min(lookups, defs) // 2)]
+        names += [f'missing_{i}' for i in range(lookups - len(names))]
+
+        def resolve(index: Optional[dict]) -> Callable[[], object]:
+            return lambda: [parse_crewai_repos.resolve_symbol_in_repo(n, {}, 'main', qual_index, index) for n in names]
+        for name, index in ((f'resolve_symbol_scan_{defs}', None), (f'resolve_symbol_index_{defs}', name_index)):
+            timing = time_it(resolve(index), repeat)
+            timing['lookups_per_sec'] = len(names) / (timing['min'] or 1e-9)
+            results[name] = timing
+    return results
+
+
+TOOLS_VALUE_SOURCE = '''
+from crewai_tools import SerperDevTool
+from pkg.tools import fetch_data, MyTool
+tools = [SerperDevTool(), fetch_data, MyTool(), missing_tool, ct.Other()]
+'''
+
+
+def traced_mb(build: Callable[[], object]) -> float:
+    """MB still allocated by build() while its result is alive."""
+    tracemalloc.start()
+    try:
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current / 1e6
+
+
+def run_memory_benchmarks(tool_refs: int) -> dict:
+    """Memory of tool_refs tool references as records and as report dicts, per 100k."""
+    results: Dict[str, dict] = {}
+    if tool_refs > 0:
+        tree = ast.parse(TOOLS_VALUE_SOURCE)
+        aliases = parse_crewai_repos.collect_import_aliases(tree)
+        value = tree.body[-1].value
+        qual_index = {
+            d.qualname: d for d in (
+                parse_crewai_repos.DefinitionInfo(name='fetch_data', kind='function', module='pkg.tools', file_path='/repo/pkg/tools.py', doc_first_line='Fetch.', qualname='pkg.tools.fetch_data'),
+                parse_crewai_repos.DefinitionInfo(name='MyTool', kind='class', module='pkg.tools', file_path='/repo/pkg/tools.py', doc_first_line='Tool.', qualname='pkg.tools.MyTool'),
+            )
+        }
+        name_index = parse_crewai_repos.build_name_index(qual_index)
+        per_value = len(parse_crewai_repos.extract_tools_from_value(value, aliases, 'main', qual_index, name_index))
+        values = -(-tool_refs // per_value)
+
+        def records() -> list:
+            return [parse_crewai_repos.extract_tools_from_value(value, aliases, 'main', qual_index, name_index) for _ in range(values)]
+        kept = records()
+        scale = 100000 / (values * per_value)
+        results['tool_refs_records'] = {'mb_per_100k': traced_mb(records) * scale}
+        results['tool_refs_dicts'] = {'mb_per_100k': traced_mb(lambda: [[ref.to_json() for ref in refs] for refs in kept]) * scale}
+    return results
+
+
+def run_clone_benchmarks(workdir: Path, urls: List[str], repeat: int, jobs: int) -> dict:
+    dest = workdir / 'clones'
+
+    def reset() -> None:
+        shutil.rmtree(dest, ignore_errors=True)
+        dest.mkdir(parents=True)
+
+    disk: Dict[str, int] = {}
+
+    def clone(name: str, j: int, **clone_kwargs) -> Callable[[], object]:
+        def run() -> None:
+            # clone_repo logs one line per repo; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = clone_crewai_repos.clone_all(urls, dest, jobs=j, retries=0, **clone_kwargs)
+            failed = [r for r in results if r.status == 'failed']
+            if failed:
+                raise RuntimeError(f'clone benchmark failed for {failed[0].url}: {failed[0].error}')
+            disk[name] = sum(r.disk_bytes or 0 for r in results)
+        return run
+
+    results = {'clone_all_serial': time_it(clone('clone_all_serial', 1), repeat, setup=reset)}
+    if jobs > 1:
+        results[f'clone_all_jobs{jobs}'] = time_it(clone(f'clone_all_jobs{jobs}', jobs), repeat, setup=reset)
+    results['clone_all_sparse'] = time_it(clone('clone_all_sparse', max(1, jobs), sparse=True), repeat, setup=reset)
+    for name, timing in results.items():
+        timing['repos_per_sec'] = len(urls) / (timing['min'] or 1e-9)
+        timing['disk_mb'] = disk[name] / (1024 * 1024)
+    return results
+
+
+def git_revision() -> Optional[str]:
+    proc = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=Path(__file__).parent)
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def format_comparison(current: dict, previous: dict) -> str:
+    lines = [f"{'BENCHMARK':<28} {'PREVIOUS':>10} {'CURRENT':>10} {'CHANGE':>8}"]
+    for section in ('parser', 'cloner', 'micro'):
+        for name, timing in current.get(section, {}).items():
+            before = previous.get(section, {}).get(name)
+            if not before:
+                continue
+            change = (timing['min'] - before['min']) / before['min'] * 100 if before['min'] else 0.0
+            lines.append(f"{name:<28} {before['min']:>9.3f}s {timing['min']:>9.3f}s {change:>+7.1f}%")
+    for name, memory in current.get('memory', {}).items():
+        before = previous.get('memory', {}).get(name)
+        if not before:
+            continue
+        change = (memory['mb_per_100k'] - before['mb_per_100k']) / before['mb_per_100k'] * 100 if before['mb_per_100k'] else 0.0
+        lines.append(f"{name:<28} {before['mb_per_100k']:>8.1f}MB {memory['mb_per_100k']:>8.1f}MB {change:>+7.1f}%")
+    return '\n'.join(lines)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the CrewAI repo parser and cloner on a synthetic corpus')
+    parser.add_argument('--repos', type=int, default=8, help='Synthetic repos in the corpus (default: 8)')
+    parser.add_argument('--files', type=int, default=200, help='Python files per repo (default: 200)')
+    parser.add_argument('--agents', type=int, default=100, help='Agent(...) calls per repo (default: 100)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus generator seed (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark; min and median are reported (default: 3)')
+    parser.add_argument('--jobs', type=int, default=4, help='Worker count for the parallel variants (default: 4)')
+    parser.add_argument('--clone-repos', type=int, default=8, help='Local bare repos for the clone benchmark; 0 skips it (default: 8)')
+    parser.add_argument('--clone-blob-mb', type=float, default=4, help='Size of the binary asset in each clone benchmark repo, in MB (default: 4)')
+    parser.add_argument('--micro-defs', type=int, default=10000, help='Definitions in the index of the symbol resolution micro-benchmark; 0 skips it (default: 10000)')
+    parser.add_argument('--micro-tool-refs', type=int, default=100000, help='Tool references held in the memory micro-benchmark; 0 skips it (default: 100000)')
+    parser.add_argument('--workdir', type=Path, default=None, help='Where to generate the corpus (default: a temporary directory, removed afterwards)')
+    parser.add_argument('--out', type=Path, default=None, help='Save results as JSON to this file')
+    parser.add_argument('--compare', type=Path, default=None, help='Earlier --out file to compare against')
+    args = parser.parse_args(argv)
+
+    tmp = None
+    workdir = args.workdir
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix='crewai-bench-')
+        workdir = Path(tmp.name)
+    workdir = workdir.resolve()
+
+    try:
+        corpus = workdir / 'corpus'
+        if corpus.exists():
+            shutil.rmtree(corpus)
+        corpus.mkdir(parents=True)
+        generate_corpus(corpus, args.repos, args.files, args.agents, args.seed)
+
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {k: v for k, v in vars(args).items() if k in ('repos', 'files', 'agents', 'seed', 'repeat', 'jobs', 'clone_repos', 'clone_blob_mb', 'micro_defs', 'micro_tool_refs')},
+            'parser': run_parser_benchmarks(corpus, args.repeat, args.jobs),
+        }
+        if args.clone_repos > 0:
+            urls = make_bare_repos(workdir / 'clone-bench', args.clone_repos, files=max(10, args.files // 4), seed=args.seed, blob_bytes=int(args.clone_blob_mb * 1024 * 1024))
+            report['cloner'] = run_clone_benchmarks(workdir / 'clone-bench', urls, args.repeat, args.jobs)
+        report['micro'] = run_micro_benchmarks(args.micro_defs, args.repeat)
+        report['memory'] = run_memory_benchmarks(args.micro_tool_refs)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    for section in ('parser', 'cloner', 'micro'):
+        for name, timing in report.get(section, {}).items():
+            rates = ', '.join(f"{timing[k]:.0f} {k.replace('_per_sec', '')}/s" for k in timing if k.endswith('_per_sec'))
+            disk = f"  {timing['disk_mb']:.1f}MB on disk" if 'disk_mb' in timing else ''
+            print(f"{name:<28} min {timing['min']:.3f}s  median {timing['median']:.3f}s  {rates}{disk}")
+    for name, memory in report.get('memory', {}).items():
+        print(f"{name:<28} {memory['mb_per_100k']:.1f}MB per 100k refs")
+
+    if args.compare is not None:
+        with args.compare.open('r', encoding='utf-8') as f:
+            print(format_comparison(report, json.load(f)))
+
+    if args.out is not None:
+        with args.out.open('w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
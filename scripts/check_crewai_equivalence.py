@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Regression check: every way of running parse_crewai_repos.py must produce the
+report of a plain serial scan.
+
+Generates a fixed synthetic corpus (bench_crewai_repos.py's generator, plus a
+repo with very deep expressions), commits each repo to git and compares, after
+dropping timings and the run-specific stats, the report of a serial --no-cache
+scan with the following, repos in emitted order:
+  - --jobs N
+  - a cold and a warm --cache
+  - the may_construct_agent pre-filter disabled (in-process)
+  - --shard 1/2 and 2/2 combined with `merge`, as JSON and as NDJSON
+  - --format ndjson
+  - --memory-ceiling-mb 1, which indexes every repo in two phases
+  - --since-state after a committed change
+  - --since-state over a dirty working tree, and again once it is reverted
+
+The deep-expression repo also checks that its agent is still found and that the
+file too deep to parse is reported as a warning instead of stopping the run.
+
+Exits 1 and prints a diff for each mode that differs; 0 if all match.
+"""
+
+import argparse
+import difflib
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import bench_crewai_repos
+import parse_crewai_repos
+
+PARSER = Path(__file__).resolve().parent / 'parse_crewai_repos.py'
+
+# Stats that legitimately differ between modes; everything else must match.
+VOLATILE_STATS = frozenset({'cache_hits', 'cache_misses', 'files_prefiltered', 'peak_rss_mb', 'repos_two_phase'})
+
+DEEP_REPO = 'deep-expressions'
+DEEP_AGENT_SOURCE = '''from crewai import Agent
+
+prompt = {chain}
+researcher = Agent(role="Researcher", goal="Find sources", llm="gpt-4o-mini")
+'''
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(['git', '-C', str(repo), '-c', 'user.name=check', '-c', 'user.email=check@example.invalid', *args], check=True, capture_output=True)
+
+
+def generate_check_corpus(root: Path, repos: int, files: int, agents: int, seed: int) -> None:
+    bench_crewai_repos.generate_corpus(root, repos, files, agents, seed)
+    deep = root / DEEP_REPO
+    deep.mkdir()
+    # 500 terms still parse but nest deeper than a recursive visitor can follow;
+    # 5000 exceed the parser's own recursion limit.
+    (deep / 'crew.py').write_text(DEEP_AGENT_SOURCE.format(chain='+'.join(['"s"'] * 500)))
+    (deep / 'huge.py').write_text('from crewai import Agent\nx = ' + '+'.join(['"s"'] * 5000) + '\n')
+    for repo in sorted(root.iterdir()):
+        git(repo, 'init', '-q')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'corpus')
+
+
+def run_parser(corpus: Path, *args: str) -> str:
+    cmd = [sys.executable, str(PARSER), '--root', str(corpus), '--file-budget', '0', '--timeout', '3600', *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args) or 'serial'} exited {proc.returncode}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def run_merge(paths: Iterable[Path], fmt: str) -> str:
+    proc = subprocess.run([sys.executable, str(PARSER), 'merge', *map(str, paths), '--format', fmt], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"merge exited {proc.returncode}: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def load_report(text: str) -> dict:
+    """A JSON report, or an NDJSON one folded back into the same shape."""
+    text = text.strip()
+    if not text.startswith('{\n'):
+        lines = [json.loads(line) for line in text.splitlines() if line.strip()]
+        *entries, trailer = lines
+        return {**trailer, 'repos': entries}
+    return json.loads(text)
+
+
+def normalize(report: dict) -> dict:
+    """The report without timings and VOLATILE_STATS; repos stay in emitted order, which every mode must preserve."""
+    return {
+        'scanned_root': report['scanned_root'],
+        'repos': report['repos'],
+        'stats': {k: v for k, v in report['stats'].items() if k not in VOLATILE_STATS},
+    }
+
+
+def report_diff(expected: dict, actual: dict) -> List[str]:
+    a = json.dumps(normalize(expected), indent=2, sort_keys=True).splitlines()
+    b = json.dumps(normalize(actual), indent=2, sort_keys=True).splitlines()
+    return list(difflib.unified_diff(a, b, 'serial', 'mode', lineterm='', n=2))
+
+
+def deep_repo_problems(report: dict) -> List[str]:
+    entry = next((e for e in report['repos'] if Path(e['repo_path']).name == DEEP_REPO), None)
+    if entry is None:
+        return [f'{DEEP_REPO} missing from the report']
+    problems = []
+    if [a['role'] for a in entry['agents']] != ['Researcher']:
+        problems.append(f"{DEEP_REPO}: expected the Researcher agent, got {entry['agents']}")
+    if not any(w['file'].endswith('huge.py') and 'recursion' in w['reason'] for w in entry['warnings']):
+        problems.append(f"{DEEP_REPO}: no recursion warning for huge.py in {entry['warnings']}")
+    return problems
+
+
+def in_process_report(corpus: Path, prefilter: bool) -> dict:
+    options = parse_crewai_repos.ScanOptions(cache_path=None, file_budget_sec=None)
+    original = parse_crewai_repos.may_construct_agent
+    if not prefilter:
+        parse_crewai_repos.may_construct_agent = lambda src: True
+    try:
+        result = parse_crewai_repos.parse_all(corpus, overall_timeout_sec=3600, options=options)
+    finally:
+        parse_crewai_repos.may_construct_agent = original
+    return json.loads(json.dumps(result, default=parse_crewai_repos.encode_record))
+
+
+def check_modes(corpus: Path, work: Path, jobs: int) -> Dict[str, List[str]]:
+    """mode -> problems (a report diff or failed expectations); empty when it matches."""
+    results: Dict[str, List[str]] = {}
+    baseline = load_report(run_parser(corpus, '--no-cache'))
+    results['serial'] = deep_repo_problems(baseline)
+
+    def check(mode: str, report: dict, expected: Optional[dict] = None) -> None:
+        results[mode] = report_diff(expected or baseline, report)
+        print(f"{mode:<32} {'ok' if not results[mode] else 'DIFFERS'}", file=sys.stderr)
+
+    check(f'--jobs {jobs}', load_report(run_parser(corpus, '--no-cache', '--jobs', str(jobs))))
+    cache = work / 'parse-cache.sqlite'
+    check('--cache (cold)', load_report(run_parser(corpus, '--cache', str(cache))))
+    check(f'--cache (warm, --jobs {jobs})', load_report(run_parser(corpus, '--cache', str(cache), '--jobs', str(jobs))))
+    check('pre-filter on (in-process)', in_process_report(corpus, prefilter=True))
+    check('pre-filter off (in-process)', in_process_report(corpus, prefilter=False))
+    for fmt in ('json', 'ndjson'):
+        shards = []
+        for i in (1, 2):
+            shards.append(work / f'shard-{i}.{fmt}')
+            shards[-1].write_text(run_parser(corpus, '--no-cache', '--shard', f'{i}/2', '--format', fmt))
+        check(f'--shard 1/2 + 2/2 merged ({fmt})', load_report(run_merge(shards, fmt)))
+    check('--format ndjson', load_report(run_parser(corpus, '--no-cache', '--format', 'ndjson')))
+    check('--memory-ceiling-mb 1', load_report(run_parser(corpus, '--no-cache', '--memory-ceiling-mb', '1')))
+
+    state = work / 'state.json'
+    check('--since-state (first run)', load_report(run_parser(corpus, '--no-cache', '--since-state', str(state))))
+    repo = next(p for p in sorted(corpus.iterdir()) if p.name != DEEP_REPO)
+    (repo / 'committed_crew.py').write_text('from crewai import Agent\n\nwriter = Agent(role="Writer", goal="Write")\n')
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'add writer')
+    current = load_report(run_parser(corpus, '--no-cache'))
+    check('--since-state (committed change)', load_report(run_parser(corpus, '--no-cache', '--since-state', str(state))), current)
+
+    crew = corpus / DEEP_REPO / 'crew.py'
+    crew.write_text(crew.read_text().replace('"Researcher"', '"Dirty"'))
+    dirty = load_report(run_parser(corpus, '--no-cache'))
+    check('--since-state (dirty tree)', load_report(run_parser(corpus, '--no-cache', '--since-state', str(state))), dirty)
+    git(corpus / DEEP_REPO, 'checkout', '-q', '--', 'crew.py')
+    check('--since-state (tree reverted)', load_report(run_parser(corpus, '--no-cache', '--since-state', str(state))), current)
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Check that every parse_crewai_repos.py mode reports the same as a serial scan of a synthetic corpus')
+    parser.add_argument('--repos', type=int, default=6, help='Synthetic repos in the corpus, besides the deep-expression one (default: 6)')
+    parser.add_argument('--files', type=int, default=60, help='Python files per repo (default: 60)')
+    parser.add_argument('--agents', type=int, default=20, help='Agent(...) calls per repo (default: 20)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus generator seed (default: 0)')
+    parser.add_argument('--jobs', type=int, default=3, help='Worker count for the parallel modes (default: 3)')
+    parser.add_argument('--workdir', type=Path, default=None, help='Where to generate the corpus; must not exist yet (default: a temporary directory, removed afterwards)')
+    args = parser.parse_args(argv)
+
+    tmp = None
+    workdir = args.workdir
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix='crewai-check-')
+        workdir = Path(tmp.name)
+    else:
+        workdir.mkdir(parents=True)
+    workdir = workdir.resolve()
+
+    try:
+        corpus = workdir / 'corpus'
+        corpus.mkdir()
+        generate_check_corpus(corpus, args.repos, args.files, args.agents, args.seed)
+        results = check_modes(corpus, workdir, args.jobs)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    failed = {mode: problems for mode, problems in results.items() if problems}
+    for mode, problems in failed.items():
+        print(f"== {mode}")
+        print('\n'.join(problems))
+    print(f"{len(results) - len(failed)}/{len(results)} modes match the serial report")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
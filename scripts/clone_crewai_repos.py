@@ -1,99 +1,298 @@
 #!/usr/bin/env python3
 import argparse
 import os
-import re
+import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
+from readme_index import DEFAULT_FRAMEWORKS, load_section_index, owner_repo_from_url, select_repo_urls, select_sections
 
-CREWAI_ANCHOR = '### <a name="CrewAI"></a>CrewAI'
-NEXT_SECTION_PREFIX = '### '
 
+DEFAULT_JOBS = 4
+DEFAULT_REPO_TIMEOUT_SEC = 300
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SEC = 2.0
 
-def read_file_text(path: Path) -> str:
-    with path.open('r', encoding='utf-8') as f:
-        return f.read()
+# Files checked out by --sparse: all the parser reads (.gitignore drives its file walk;
+# YAML holds the agents config of @CrewBase projects).
+DEFAULT_SPARSE_PATTERNS = ('*.py', '*.yaml', '*.yml', '.gitignore')
 
 
-def extract_crewai_repo_urls(readme_text: str) -> list[str]:
-    lines = readme_text.splitlines()
+@dataclass
+class CloneResult:
+    url: str
+    target_dir: Path
+    status: str  # 'cloned' | 'pulled' | 'skipped' | 'failed'
+    duration: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+    disk_bytes: Optional[int] = None  # checkout plus its git objects (in --object-cache too)
+    skipped_files: Optional[int] = None  # tracked files left out of a --sparse checkout
 
-    try:
-        start_idx = next(i for i, line in enumerate(lines) if line.strip() == CREWAI_ANCHOR)
-    except StopIteration:
-        raise RuntimeError('CrewAI section not found in README.md')
 
-    repo_urls: list[str] = []
-    for line in lines[start_idx + 1:]:
-        if line.startswith(NEXT_SECTION_PREFIX):
+def run_git_with_retries(cmd: list[str], deadline: float, retries: int, backoff: float, cleanup: Optional[Path] = None) -> tuple[int, Optional[str]]:
+    """Run a git command, retrying failures with exponential backoff until deadline (a time.monotonic() value).
+
+    Each attempt gets the time left before deadline; once it is used up, or
+    the next backoff would pass it, no more attempts are made.
+    cleanup is removed before each retry so a half-written clone does not block the next attempt.
+    Returns (attempts, error); error is None on success.
+    """
+    error: Optional[str] = None
+    attempts = 0
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1)
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+            if cleanup is not None and cleanup.exists():
+                shutil.rmtree(cleanup, ignore_errors=True)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            error = error or 'repo timeout reached'
+            break
+        attempts += 1
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=remaining)
+        except subprocess.TimeoutExpired:
+            error = 'repo timeout reached'
             break
-        if not line.strip().startswith('-'):
-            continue
-        # Extract first markdown link URL in the line
-        match = re.search(r"\((https?://github\.com/[^)]+)\)", line)
-        if match:
-            url = match.group(1).strip()
-            repo_urls.append(url)
-
-    # de-duplicate while preserving order
-    seen = set()
-    deduped = []
-    for url in repo_urls:
-        if url not in seen:
-            seen.add(url)
-            deduped.append(url)
-    return deduped
-
-
-def owner_repo_from_url(url: str) -> tuple[str, str]:
-    # e.g., https://github.com/owner/repo or with trailing parts
-    m = re.match(r"https?://github\.com/([^/]+)/([^/#?]+)", url)
-    if not m:
-        raise ValueError(f'Unrecognized GitHub URL: {url}')
-    return m.group(1), m.group(2)
-
-
-def clone_repo(url: str, dest_dir: Path, shallow: bool = True, skip_existing: bool = True) -> None:
+        if proc.returncode == 0:
+            return attempts, None
+        lines = (proc.stderr or '').strip().splitlines()
+        fatal = [line for line in lines if line.startswith(('fatal:', 'error:'))]
+        error = (fatal or lines or [f'exit status {proc.returncode}'])[0]
+    if cleanup is not None and cleanup.exists():
+        shutil.rmtree(cleanup, ignore_errors=True)
+    return max(attempts, 1), error
+
+
+def run_git_steps(steps: list[tuple[list[str], Optional[Path]]], deadline: float, retries: int, backoff: float) -> tuple[int, Optional[str]]:
+    """Run (command, cleanup) steps in order with run_git_with_retries, stopping at the first failure.
+
+    All steps share one deadline (a time.monotonic() value). Returns
+    (attempts, error), attempts counting the steps' retries as in a single
+    command: 1 when every step succeeded first time.
+    """
+    retried = 0
+    for cmd, cleanup in steps:
+        attempts, error = run_git_with_retries(cmd, deadline, retries, backoff, cleanup)
+        retried += attempts - 1
+        if error:
+            return retried + 1, error
+    return retried + 1, None
+
+
+def tree_size(path: Path) -> int:
+    """Bytes in the files under path (or of path itself), not following symlinks."""
+    if not path.is_dir():
+        return path.stat().st_size if path.exists() else 0
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def git_query(target_dir: Path, args: list[str], deadline: float) -> Optional[bytes]:
+    """stdout of a read-only git command in target_dir, run once within deadline (a time.monotonic() value).
+
+    None if it fails or the deadline passes first.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    try:
+        proc = subprocess.run(['git', '-C', str(target_dir), *args], capture_output=True, timeout=remaining)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def count_skipped_files(target_dir: Path, deadline: float) -> Optional[int]:
+    """Tracked files outside the sparse checkout (skip-worktree entries); reads only the index."""
+    listing = git_query(target_dir, ['ls-files', '-t', '-z'], deadline)
+    if listing is None:
+        return None
+    return sum(1 for entry in listing.split(b'\0') if entry.startswith(b'S '))
+
+
+def clone_steps(url: str, target_dir: Path, shallow: bool, sparse: bool, sparse_patterns: tuple[str, ...], mirror: Optional[Path]) -> list[tuple[list[str], Optional[Path]]]:
+    """git commands that create target_dir; see clone_repo."""
+    depth = ['--depth', '1'] if shallow else []
+    blobless = ['--filter=blob:none'] if sparse else []
+    steps: list[tuple[list[str], Optional[Path]]] = []
+    if mirror is None:
+        steps.append((['git', 'clone', *depth, *blobless, *(['--no-checkout'] if sparse else []), url, str(target_dir)], target_dir))
+        rev = None
+    else:
+        if mirror.exists():
+            # Bring the cached objects up to date; the checkout is made from FETCH_HEAD.
+            steps.append((['git', '-C', str(mirror), 'fetch', '-q', *depth, 'origin', 'HEAD'], None))
+            rev = 'FETCH_HEAD'
+        else:
+            steps.append((['git', 'clone', '-q', '--bare', *depth, *blobless, url, str(mirror)], mirror))
+            rev = 'HEAD'
+        # A checkout deleted since the last run is still registered in the mirror.
+        steps.append((['git', '-C', str(mirror), 'worktree', 'prune'], None))
+        steps.append((['git', '-C', str(mirror), 'worktree', 'add', '-q', '--detach', *(['--no-checkout'] if sparse else []), str(target_dir), rev], target_dir))
+    if sparse:
+        steps.append((['git', '-C', str(target_dir), 'sparse-checkout', 'set', '--no-cone', *sparse_patterns], None))
+        # Fetches the missing blobs of the checked-out files in one batch
+        steps.append((['git', '-C', str(target_dir), 'checkout', '-q'], None))
+    return steps
+
+
+def clone_repo(
+    url: str,
+    dest_dir: Path,
+    shallow: bool = True,
+    skip_existing: bool = True,
+    timeout: float = DEFAULT_REPO_TIMEOUT_SEC,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SEC,
+    sparse: bool = False,
+    sparse_patterns: tuple[str, ...] = DEFAULT_SPARSE_PATTERNS,
+    object_cache: Optional[Path] = None,
+) -> CloneResult:
+    """Clone url into dest_dir/<owner>-<repo>, or update or skip an existing clone.
+
+    With sparse, the clone is blob-less (--filter=blob:none) and only files
+    matching sparse_patterns (gitignore-style) are checked out, so only their
+    blobs are ever fetched. With object_cache, the repo's objects live in a
+    bare mirror object_cache/<owner>-<repo>.git, kept across runs, and
+    target_dir is a worktree of it: recreating a deleted checkout, or
+    updating one, only fetches what the mirror lacks.
+
+    timeout bounds all git commands of the repo together, retries and
+    backoff included.
+    """
     owner, repo = owner_repo_from_url(url)
     target_dir = dest_dir / f"{owner}-{repo}"
+    mirror = object_cache / f"{owner}-{repo}.git" if object_cache is not None else None
+    start = time.monotonic()
+    deadline = start + timeout
 
     if target_dir.exists():
         if skip_existing:
             print(f"[skip] {target_dir} already exists")
-            return
+            return CloneResult(url=url, target_dir=target_dir, status='skipped')
         else:
             # Attempt to update existing repo
             print(f"[pull] {target_dir}")
-            try:
-                subprocess.run(
-                    [
-                        'git', '-C', str(target_dir), 'pull', '--ff-only'
-                    ],
-                    check=True,
-                )
-            except subprocess.CalledProcessError as e:
-                print(f"[warn] git pull failed for {url}: {e}")
-            return
-
-    cmd = ['git', 'clone']
-    if shallow:
-        cmd += ['--depth', '1']
-    cmd += [url, str(target_dir)]
+            if (target_dir / '.git').is_file():
+                # A detached worktree of an --object-cache mirror
+                steps = [
+                    (['git', '-C', str(target_dir), 'fetch', '-q', *(['--depth', '1'] if shallow else []), 'origin', 'HEAD'], None),
+                    (['git', '-C', str(target_dir), 'reset', '-q', '--hard', 'FETCH_HEAD'], None),
+                ]
+            else:
+                steps = [(['git', '-C', str(target_dir), 'pull', '--ff-only'], None)]
+            attempts, error = run_git_steps(steps, deadline, retries, backoff)
+            if error:
+                print(f"[warn] git pull failed for {url}: {error}")
+            return finish_result(CloneResult(
+                url=url,
+                target_dir=target_dir,
+                status='failed' if error else 'pulled',
+                duration=time.monotonic() - start,
+                attempts=attempts,
+                error=error,
+            ), mirror, deadline)
 
     print(f"[clone] {url} -> {target_dir}")
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"[error] git clone failed for {url}: {e}")
+    if mirror is not None:
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+    attempts, error = run_git_steps(clone_steps(url, target_dir, shallow, sparse, sparse_patterns, mirror), deadline, retries, backoff)
+    if error:
+        print(f"[error] git clone failed for {url}: {error}")
+        # Don't leave a half-made checkout for the next run to skip
+        shutil.rmtree(target_dir, ignore_errors=True)
+    return finish_result(CloneResult(
+        url=url,
+        target_dir=target_dir,
+        status='failed' if error else 'cloned',
+        duration=time.monotonic() - start,
+        attempts=attempts,
+        error=error,
+    ), mirror, deadline)
+
+
+def finish_result(result: CloneResult, mirror: Optional[Path], deadline: float) -> CloneResult:
+    """Fill in the disk use and sparse-checkout counts of a successful clone or pull.
+
+    The git queries share the repo's deadline; the counts are left unset if it passes.
+    """
+    if result.error is None:
+        result.disk_bytes = tree_size(result.target_dir) + (tree_size(mirror) if mirror is not None else 0)
+        sparse = git_query(result.target_dir, ['config', '--bool', 'core.sparseCheckout'], deadline)
+        if sparse is not None and sparse.strip() == b'true':
+            result.skipped_files = count_skipped_files(result.target_dir, deadline)
+    return result
+
+
+def clone_all(urls: list[str], dest_dir: Path, jobs: int = DEFAULT_JOBS, **clone_kwargs) -> list[CloneResult]:
+    """Clone or update every URL on a bounded thread pool; results keep the order of urls."""
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(clone_repo, url=url, dest_dir=dest_dir, **clone_kwargs) for url in urls]
+        return [f.result() for f in futures]
+
+
+def format_size(n: Optional[int]) -> str:
+    if n is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+def format_summary(results: list[CloneResult]) -> str:
+    rows = [('STATUS', 'TIME', 'TRIES', 'DISK', 'SKIPPED', 'REPO')]
+    for r in results:
+        repo = r.target_dir.name if not r.error else f"{r.target_dir.name} ({r.error})"
+        skipped = f"{r.skipped_files} files" if r.skipped_files is not None else '-'
+        rows.append((r.status, f"{r.duration:.1f}s", str(r.attempts), format_size(r.disk_bytes), skipped, repo))
+    widths = [max(len(row[i]) for row in rows) for i in range(5)]
+    lines = [
+        f"{row[0]:<{widths[0]}}  {row[1]:>{widths[1]}}  {row[2]:>{widths[2]}}  {row[3]:>{widths[3]}}  {row[4]:>{widths[4]}}  {row[5]}"
+        for row in rows
+    ]
+
+    counts = {status: 0 for status in ('cloned', 'pulled', 'skipped', 'failed')}
+    for r in results:
+        counts[r.status] += 1
+    total = sum(r.duration for r in results)
+    disk = sum(r.disk_bytes or 0 for r in results)
+    lines.append(', '.join(f"{n} {status}" for status, n in counts.items()) + f" ({total:.1f}s total git time, {format_size(disk)} on disk)")
+    return '\n'.join(lines)
 
 
 def main(argv: list[str]) -> int:
-    parser = argparse.ArgumentParser(description='Clone all CrewAI repos listed in README.md')
+    parser = argparse.ArgumentParser(description='Clone the repos listed under framework sections of README.md (CrewAI by default)')
     parser.add_argument('--readme', type=Path, default=Path('README.md'), help='Path to README.md')
+    parser.add_argument('--framework', action='append', default=None, help=f"README section to clone the repos of, e.g. CrewAI, LangGraph or 'all'; repeatable (default: {' '.join(DEFAULT_FRAMEWORKS)})")
+    parser.add_argument('--list-frameworks', action='store_true', help='List the README sections and their repo counts, then exit')
     parser.add_argument('--dest', type=Path, default=Path('crewai-repos'), help='Destination directory for clones')
     parser.add_argument('--no-shallow', action='store_true', help='Disable shallow clone (clone full history)')
     parser.add_argument('--update-existing', action='store_true', help='git pull if repo directory already exists')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help=f'Number of concurrent git operations (default: {DEFAULT_JOBS})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_REPO_TIMEOUT_SEC, help=f'Per-repo timeout seconds, covering every git command, retry and backoff of the repo (default: {DEFAULT_REPO_TIMEOUT_SEC})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help=f'Retries after a failed or timed out git attempt (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF_SEC, help=f'Initial retry delay seconds, doubled on each retry (default: {DEFAULT_BACKOFF_SEC:g})')
+    parser.add_argument('--sparse', action='store_true', help=f"Blob-less clone (--filter=blob:none) with a sparse checkout of only the files the parser reads (default patterns: {' '.join(DEFAULT_SPARSE_PATTERNS)})")
+    parser.add_argument('--sparse-pattern', action='append', default=None, metavar='PATTERN', help='gitignore-style pattern of files to check out with --sparse, replacing the defaults; repeatable')
+    parser.add_argument('--object-cache', type=Path, default=None, help='Keep each repo\'s git objects in a bare mirror under this directory (outside --dest), reused across runs; clones become worktrees of their mirror')
     args = parser.parse_args(argv)
 
     readme_path = args.readme.resolve()
@@ -103,24 +302,39 @@ def main(argv: list[str]) -> int:
         print(f"README not found: {readme_path}", file=sys.stderr)
         return 1
 
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    readme_text = read_file_text(readme_path)
-    urls = extract_crewai_repo_urls(readme_text)
+    index = load_section_index(readme_path)
+    if args.list_frameworks:
+        for name, section_urls in index.items():
+            print(f"{len(section_urls):>5}  {name}")
+        return 0
+    try:
+        sections = select_sections(index, args.framework or DEFAULT_FRAMEWORKS)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    urls = select_repo_urls(index, sections)
 
     if not urls:
-        print('No GitHub URLs found under CrewAI section', file=sys.stderr)
+        print(f"No GitHub URLs found under {', '.join(sections)}", file=sys.stderr)
         return 2
 
-    print(f"Found {len(urls)} CrewAI repos")
-    for url in urls:
-        clone_repo(
-            url=url,
-            dest_dir=dest_dir,
-            shallow=not args.no_shallow,
-            skip_existing=not args.update_existing,
-        )
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Found {len(urls)} repos in {', '.join(sections)}")
+    results = clone_all(
+        urls,
+        dest_dir,
+        jobs=args.jobs,
+        shallow=not args.no_shallow,
+        skip_existing=not args.update_existing,
+        timeout=args.timeout,
+        retries=args.retries,
+        backoff=args.backoff,
+        sparse=args.sparse,
+        sparse_patterns=tuple(args.sparse_pattern or DEFAULT_SPARSE_PATTERNS),
+        object_cache=args.object_cache.resolve() if args.object_cache is not None else None,
+    )
 
+    print(format_summary(results))
     print('Done.')
     return 0
 
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Per-repo module import graph for parse_crewai_repos.py tool resolution.
+
+Each module contributes a symbol table of its top-level bindings, computed
+once when the file is indexed and stored with its parse record:
+
+  from .tools import X as Y       => {'Y': ['import', 'pkg.tools.X']}
+  import pkg.tools as t           => {'t': ['import', 'pkg.tools']}
+  search_tool = SerperDevTool()   => {'search_tool': ['call', 'SerperDevTool']}
+  tool = other.tool               => {'tool': ['ref', 'other.tool']}
+  tools = [a, B()]                => {'tools': ['list', [['ref', 'a'], ['call', 'B']]]}
+  MODEL = "gpt-4o"                => {'MODEL': ['const', 'gpt-4o']}
+  llm = LLM(model="gpt-4o")       => {'llm': ['call', 'LLM', 'gpt-4o']}
+
+plus the modules it star-imports. Relative imports are made absolute against
+the importing module. ImportGraph follows these bindings across modules
+(re-exports through __init__.py, module attributes, variables bound to tool
+instances) down to a repo definition or a crewai_tools class, memoizing each
+(module, name) it resolves so every module's exports are worked out once.
+ImportGraph.locate follows only imports and references, to the constant or
+call a name is bound to (used to classify an Agent's llm=).
+
+Resolution targets are (kind, name) pairs:
+  ('def', qualname)      a top-level class/function in the repo
+  ('external', name)     a crewai_tools class
+  ('unknown', name)      the last name reached; left to the caller's heuristics
+  ('unresolved', name)   settled as no tool (a constant, or a list element
+                         that is no name); recorded as unknown, never looked up
+"""
+
+import ast
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+Target = Tuple[str, str]
+
+# Marks a (module, name) whose resolution is in progress, to cut import cycles.
+_IN_PROGRESS = object()
+
+# A call binding keeps the first string passed as one of these keywords
+# (the model an LLM constructor names).
+MODEL_KEYWORDS = ('model', 'model_name', 'model_id')
+
+# Longer string constants are not kept in symbol tables.
+MAX_CONST_LEN = 200
+
+
+def dotted_name(node: ast.AST) -> Optional[str]:
+    """'a.b.c' for a Name/Attribute chain, else None."""
+    parts: List[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def binding_for_value(node: Optional[ast.AST]) -> Optional[list]:
+    """Describe what an assigned value refers to, or None if it is not followed."""
+    if isinstance(node, ast.Call):
+        callee = dotted_name(node.func)
+        if not callee:
+            return None
+        for kw in node.keywords:
+            if kw.arg in MODEL_KEYWORDS and isinstance(kw.value, ast.Constant) and isinstance(kw.value.value, str):
+                return ['call', callee, kw.value.value]
+        return ['call', callee]
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, str) and len(node.value) <= MAX_CONST_LEN:
+            return ['const', node.value]
+        return None
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return ['list', [binding_for_value(e) for e in node.elts]]
+    ref = dotted_name(node) if node is not None else None
+    return ['ref', ref] if ref else None
+
+
+def absolute_module(module: str, level: int, name: Optional[str]) -> str:
+    """Absolute module named by 'from <level dots><name> import ...' inside module."""
+    if level == 0:
+        return name or ''
+    # Both 'pkg.mod' and 'pkg.__init__' live in package 'pkg'.
+    package = module.split('.')[:-1]
+    if level > 1:
+        package = package[:-(level - 1)] if level - 1 < len(package) else []
+    if name:
+        package.append(name)
+    return '.'.join(package)
+
+
+def import_bindings(node: ast.AST, module: str) -> Iterator[Tuple[str, list]]:
+    """(local name, binding) pairs introduced by an Import/ImportFrom; '*' for star imports."""
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            if alias.asname:
+                yield alias.asname, ['import', alias.name]
+            else:
+                # 'import a.b' binds 'a'
+                head = alias.name.split('.', 1)[0]
+                yield head, ['import', head]
+    elif isinstance(node, ast.ImportFrom):
+        base = absolute_module(module, node.level, node.module)
+        for alias in node.names:
+            if alias.name == '*':
+                yield '*', ['import', base]
+                continue
+            target = f"{base}.{alias.name}" if base else alias.name
+            yield alias.asname or alias.name, ['import', target]
+
+
+def assignment_targets(node: ast.AST) -> List[ast.AST]:
+    if isinstance(node, ast.Assign):
+        return node.targets
+    if isinstance(node, ast.AnnAssign) and node.value is not None:
+        return [node.target]
+    return []
+
+
+def module_symbols(tree: ast.AST, module: str) -> Tuple[Dict[str, list], List[str]]:
+    """Top-level bindings of a module and the modules it star-imports.
+
+    Statements nested in top-level if/try blocks count as top level; function
+    and class bodies do not.
+    """
+    symbols: Dict[str, list] = {}
+    stars: List[str] = []
+    pending = list(getattr(tree, 'body', []))
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for name, binding in import_bindings(node, module):
+                if name == '*':
+                    stars.append(binding[1])
+                else:
+                    symbols[name] = binding
+        elif isinstance(node, (ast.If, ast.Try)):
+            nested = list(node.body) + list(node.orelse)
+            for handler in getattr(node, 'handlers', []):
+                nested.extend(handler.body)
+            nested.extend(getattr(node, 'finalbody', []))
+            pending[:0] = nested
+        else:
+            for target in assignment_targets(node):
+                if isinstance(target, ast.Name):
+                    binding = binding_for_value(node.value)
+                    if binding is not None:
+                        symbols[target.id] = binding
+    return symbols, stars
+
+
+class ImportGraph:
+    def __init__(self, definitions: Iterable[str]) -> None:
+        # Qualnames of top-level definitions; any container supporting 'in'.
+        self.definitions = definitions
+        self.symbols: Dict[str, Dict[str, list]] = {}
+        self.stars: Dict[str, List[str]] = {}
+        self._packages: Dict[str, str] = {}  # 'pkg' -> 'pkg.__init__'
+        self._by_suffix: Optional[Dict[str, List[str]]] = None
+        self._memo: Dict[Tuple[str, str], object] = {}
+
+    def add_module(self, module: str, symbols: Dict[str, list], stars: List[str]) -> None:
+        self.symbols[module] = symbols
+        if stars:
+            self.stars[module] = stars
+        if module.endswith('.__init__'):
+            self._packages[module[:-len('.__init__')]] = module
+        self._by_suffix = None
+
+    def find_module(self, name: str) -> Optional[str]:
+        """Repo module for an absolute module name, tolerating a src/-style prefix."""
+        if name in self.symbols:
+            return name
+        if name in self._packages:
+            return self._packages[name]
+        if self._by_suffix is None:
+            self._by_suffix = {}
+            for module in self.symbols:
+                key = module[:-len('.__init__')] if module.endswith('.__init__') else module
+                parts = key.split('.')
+                for i in range(1, len(parts)):
+                    self._by_suffix.setdefault('.'.join(parts[i:]), []).append(module)
+        matches = self._by_suffix.get(name, [])
+        return matches[0] if len(matches) == 1 else None
+
+    def resolve(self, module: str, expr: str, local: Optional[Dict[str, list]] = None) -> Tuple[Target, ...]:
+        """Targets a dotted expression used in module refers to.
+
+        local holds extra bindings of the module's source (e.g. function-local
+        assignments, keyed by 'name' or 'self.attr') that take precedence.
+        """
+        return self._resolve_local(module, expr, local or {}, set())
+
+    def _resolve_local(self, module: str, expr: str, local: Dict[str, list], seen: Set[str]) -> Tuple[Target, ...]:
+        parts = expr.split('.')
+        for n in (2, 1):
+            key = '.'.join(parts[:n])
+            if len(parts) >= n and key in local and key not in seen:
+                rest = '.'.join(parts[n:])
+                return self._follow(module, local[key], rest,
+                                    lambda e: self._resolve_local(module, e, local, seen | {key}))
+        return self._resolve_in_module(module, expr)
+
+    def _resolve_in_module(self, module: str, expr: str) -> Tuple[Target, ...]:
+        found = self._lookup(module, expr)
+        return found if found is not None else (('unknown', expr.rsplit('.', 1)[-1]),)
+
+    def _lookup(self, module: str, expr: str) -> Optional[Tuple[Target, ...]]:
+        """Memoized resolution of expr in module's namespace; None if module never binds it."""
+        key = (module, expr)
+        if key in self._memo:
+            cached = self._memo[key]
+            if cached is _IN_PROGRESS:
+                return (('unknown', expr.rsplit('.', 1)[-1]),)
+            return cached  # type: ignore[return-value]
+        self._memo[key] = _IN_PROGRESS
+        found = self._lookup_uncached(module, expr)
+        if found is None:
+            del self._memo[key]
+        else:
+            self._memo[key] = found
+        return found
+
+    def _lookup_uncached(self, module: str, expr: str) -> Optional[Tuple[Target, ...]]:
+        head, _, rest = expr.partition('.')
+        qualname = f"{module}.{head}"
+        if qualname in self.definitions:
+            return (('def', qualname),) if not rest else (('unknown', expr.rsplit('.', 1)[-1]),)
+        binding = self.symbols.get(module, {}).get(head)
+        if binding is not None:
+            return self._follow(module, binding, rest, lambda e: self._resolve_in_module(module, e))
+        for star in self.stars.get(module, []):
+            star_module = self.find_module(star)
+            if star_module is not None and star_module != module:
+                found = self._lookup(star_module, expr)
+                if found is not None:
+                    return found
+        return None
+
+    def split_absolute(self, name: str) -> Optional[Tuple[str, str]]:
+        """(repo module, expression in it) for an absolute dotted name, longest module first."""
+        parts = name.split('.')
+        for i in range(len(parts) - 1, 0, -1):
+            module = self.find_module('.'.join(parts[:i]))
+            if module is not None:
+                return module, '.'.join(parts[i:])
+        return None
+
+    def resolve_absolute(self, name: str) -> Tuple[Target, ...]:
+        if name in self.definitions:
+            return (('def', name),)
+        parts = name.split('.')
+        if parts[0] == 'crewai_tools' and len(parts) > 1:
+            return (('external', parts[-1]),)
+        found = self.split_absolute(name)
+        if found is not None:
+            return self._resolve_in_module(*found)
+        return (('unknown', parts[-1]),)
+
+    def locate(self, module: str, expr: str) -> Optional[list]:
+        """The 'const', 'call' or 'list' binding expr names in module, following
+        imports and references across modules; None if it leaves the repo or is unbound."""
+        seen: Set[Tuple[str, str]] = set()
+        while (module, expr) not in seen:
+            seen.add((module, expr))
+            head, _, rest = expr.partition('.')
+            binding = self.symbols.get(module, {}).get(head)
+            if binding is None:
+                for star in self.stars.get(module, []):
+                    star_module = self.find_module(star)
+                    if star_module is not None and head in self.symbols[star_module]:
+                        module, binding = star_module, self.symbols[star_module][head]
+                        break
+                else:
+                    return None
+            kind, value = binding[0], binding[1]
+            if kind == 'import':
+                found = self.split_absolute(f"{value}.{rest}" if rest else value)
+                if found is None:
+                    return None
+                module, expr = found
+            elif kind == 'ref':
+                expr = f"{value}.{rest}" if rest else value
+            else:
+                return binding if not rest else None
+        return None
+
+    def _follow(self, module: str, binding: list, rest: str, resolve_expr: Callable[[str], Tuple[Target, ...]]) -> Tuple[Target, ...]:
+        kind, value = binding[0], binding[1]
+        if kind == 'import':
+            return self.resolve_absolute(f"{value}.{rest}" if rest else value)
+        if kind == 'ref':
+            return resolve_expr(f"{value}.{rest}" if rest else value)
+        if rest:
+            # attribute of an instance or of a list
+            return (('unknown', rest.rsplit('.', 1)[-1]),)
+        if kind == 'const':
+            return (('unresolved', 'unknown'),)
+        if kind == 'call':
+            # an instance stands for the tool class it was constructed from
+            return resolve_expr(value)
+        targets: List[Target] = []
+        for element in value:
+            if element is None:
+                targets.append(('unresolved', 'unknown'))
+            else:
+                targets.extend(self._follow(module, element, '', resolve_expr))
+        return tuple(targets)
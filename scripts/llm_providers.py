@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+LLM provider registry for parse_crewai_repos.py.
+
+Providers are read from a JSON file (default: llm_providers.json next to this
+script), in priority order:
+
+  {"providers": [
+    {"name": "openai", "keywords": ["gpt", "o1"], "prefixes": ["openai"], "classes": ["ChatOpenAI"]},
+    ...
+  ]}
+
+A model string is labelled '<provider>:<string>' by, in turn:
+  - a LiteLLM-style '<prefix>/' at its start ('groq/llama3-8b' => groq)
+  - the first provider, in file order, with a keyword anywhere in it
+    (case-insensitive)
+and 'unknown' otherwise. Prefixes are a dict lookup; all keywords are
+compiled into one regex, so a string is scanned once, and results are kept
+in an LRU cache. classes maps
+constructor names such as ChatOpenAI or Ollama to their provider.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_PROVIDERS_PATH = Path(__file__).resolve().with_name('llm_providers.json')
+CLASSIFY_CACHE_SIZE = 4096
+
+
+class ProviderRegistry:
+    def __init__(self, providers: List[dict]) -> None:
+        self.prefix_providers: Dict[str, str] = {}
+        for p in reversed(providers):
+            self.prefix_providers.update((x.lower(), p['name']) for x in p.get('prefixes', []))
+        # One capturing group per provider with keywords, in priority order;
+        # the group that matched names the provider.
+        alternatives: List[str] = []
+        self._group_providers: List[str] = []  # regex group n+1 -> provider
+        for p in providers:
+            if p.get('keywords'):
+                alternatives.append('(' + '|'.join(re.escape(k.lower()) for k in p['keywords']) + ')')
+                self._group_providers.append(p['name'])
+        self._pattern = re.compile('|'.join(alternatives), re.DOTALL) if alternatives else None
+        self.class_providers: Dict[str, str] = {
+            cls: p['name'] for p in providers for cls in p.get('classes', [])
+        }
+        self.digest = hashlib.sha256(json.dumps(providers, sort_keys=True).encode('utf-8')).hexdigest()
+        self.classify = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify)
+
+    def provider_for(self, value: str) -> Optional[str]:
+        """Provider named by a prefix, else by the earliest-listed provider with a keyword in value."""
+        value = value.lower()
+        prefix, slash, _ = value.partition('/')
+        if slash and prefix in self.prefix_providers:
+            return self.prefix_providers[prefix]
+        m = self._pattern.search(value) if self._pattern is not None else None
+        if m is None:
+            return None
+        best = m.lastindex
+        if best > 1:
+            # A later keyword might belong to a higher-priority provider
+            for m in self._pattern.finditer(value, m.end()):
+                best = min(best, m.lastindex)
+        return self._group_providers[best - 1]
+
+    def _classify(self, value: Optional[str]) -> Optional[str]:
+        """'<provider>:<value>', 'unknown', or None for an empty value."""
+        if not value:
+            return None
+        provider = self.provider_for(value)
+        return f"{provider}:{value}" if provider is not None else 'unknown'
+
+    def classify_call(self, class_name: Optional[str], model: Optional[str]) -> Optional[str]:
+        """Label for an LLM constructed as class_name(model=...); None if neither says anything."""
+        provider = self.class_providers.get(class_name) if class_name else None
+        if provider is not None:
+            return f"{provider}:{model or class_name}"
+        return self.classify(model)
+
+
+def load_registry(path: Path) -> ProviderRegistry:
+    """Registry from a providers file; raises ValueError if it is malformed."""
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f'cannot read LLM provider file {path}: {e}') from e
+    providers = doc.get('providers') if isinstance(doc, dict) else None
+    if not isinstance(providers, list) or not all(isinstance(p, dict) and isinstance(p.get('name'), str) for p in providers):
+        raise ValueError(f'{path}: expected {{"providers": [{{"name": ..., ...}}, ...]}}')
+    return ProviderRegistry(providers)
+
+
+@lru_cache(maxsize=8)
+def registry_for(path: Optional[Path] = None) -> ProviderRegistry:
+    """Shared registry for a providers file (default: DEFAULT_PROVIDERS_PATH), loaded once per process."""
+    return load_registry(path or DEFAULT_PROVIDERS_PATH)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Persistent key/value cache for parse_crewai_repos.py.
+
+Values are JSON documents stored in a single SQLite file. Each entry records
+its size and last access time; when the file grows past its size cap the least
+recently used entries are evicted on close.
+
+Several parser worker processes may share one cache file: each opens its own
+connection, and SQLite serialises the writes. Reads never wait (WAL mode).
+Writes (new entries and the last access time of hits) are buffered and
+written in one short transaction every FLUSH_EVERY entries and on close,
+so a worker holds the write lock for milliseconds, never for a whole repo
+scan.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+DEFAULT_CACHE_PATH = Path('.cache') / 'parse_crewai_repos.sqlite'
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Buffered writes are flushed once this many are pending.
+FLUSH_EVERY = 500
+
+
+class ParseCache:
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[str, str] = {}  # key -> JSON value not yet written
+        self._touched: Dict[str, float] = {}  # key -> last access time not yet written
+        # Autocommit: transactions are opened explicitly, and only to write.
+        self._conn = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._write():
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' last_used REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+
+    def __enter__(self) -> 'ParseCache':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """One write transaction; the lock is taken up front so it cannot fail half way."""
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self._pending.get(key)
+        if data is None:
+            row = self._conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data = row[0]
+            self._touch(key)
+        self.hits += 1
+        return json.loads(data)
+
+    def put(self, key: str, value: Any) -> None:
+        self._pending[key] = json.dumps(value, ensure_ascii=False)
+        self._touched.pop(key, None)
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def _touch(self, key: str) -> None:
+        self._touched[key] = time.time()
+        if len(self._touched) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered entries and access times in one transaction."""
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        with self._write():
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                ((key, data, len(data.encode('utf-8')), now) for key, data in self._pending.items()),
+            )
+            self._conn.executemany(
+                'UPDATE entries SET last_used = ? WHERE key = ?',
+                ((used, key) for key, used in self._touched.items()),
+            )
+        self._pending.clear()
+        self._touched.clear()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the total size fits max_bytes; returns count dropped."""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        dropped = 0
+        with self._write():
+            for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_used').fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                total -= size
+                dropped += 1
+        return dropped
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            self.evict()
+        finally:
+            self._conn.close()
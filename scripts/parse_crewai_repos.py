@@ -3,42 +3,307 @@
 Repository parser for CrewAI agents and tools.
 
 Scans all Git repos under a root (default: ./crewai-repos) and extracts:
-  - Agents defined via crewai.Agent(...)
+  - Agents defined via crewai.Agent(...), including those whose fields come
+    from a @CrewBase project's config/agents.yaml, and with --extractor those
+    of other frameworks (see agent_extractors.py)
   - Tools used by each agent, resolving developer-defined tools (in-repo)
-    and marking crewai_tools classes as external.
+    and marking crewai_tools classes as external. Tool names are followed
+    through imports, re-exports and variable bindings (see import_graph.py).
+  - The LLM provider of each agent, from its llm= string, constructor call or
+    the variable/constant it names, per llm_providers.json (see llm_providers.py).
 
 Notes:
   - Python-only AST parsing. No code execution.
   - Resilient to syntax errors per file.
-  - Ignores venv/.venv/node_modules/.git/__pycache__/build artifacts.
+  - Ignores venv/.venv/node_modules/.git/__pycache__/build artifacts and
+    anything the repo's .gitignore excludes; see repo_files.py and
+    --exclude/--include.
   - Produces one JSON document per the prompt's schema.
+  - Caches per-file definitions and agents by content hash in a SQLite file
+    (see parse_cache.py); pass --no-cache to disable.
+  - --framework limits the scan to the repos README.md lists under those
+    framework sections (see readme_index.py).
+  - --shard i/N scans one of N disjoint subsets of the repos; the shard
+    reports combine with `parse_crewai_repos.py merge` (see report_merge.py)
+    into the report of a single run.
+  - --memory-ceiling-mb bounds memory on huge repos: above it, a repo's
+    sources and ASTs are not kept between indexing and agent extraction.
 """
 
 import argparse
 import ast
+import cProfile
+import hashlib
 import json
 import os
+import re
+import subprocess
 import sys
 import time
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import ContextManager, Dict, FrozenSet, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+from agent_extractors import (
+    DEFAULT_EXTRACTORS, EXTRACTORS, AgentFields, DeadlinePassed, ExtractionContext, ExtractionVisitor, ExtractorSet, config_digest,
+    extractor_set, registered_markers,
+)
+from import_graph import MODEL_KEYWORDS, ImportGraph, dotted_name, module_symbols
+from llm_providers import DEFAULT_PROVIDERS_PATH, ProviderRegistry, load_registry, registry_for
+from parse_cache import DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_PATH, ParseCache
+from parse_profile import DEFAULT_SLOWEST_FILES, PhaseProfiler, merge_timings
+from repo_files import WalkOptions, iter_repo_files
+from readme_index import load_section_index, repo_dir_name, select_repo_urls, select_sections
+from report_merge import ShardReport, add_stats, merge_reports
+
+try:
+    import resource
+except ImportError:  # not on Windows; peak RSS is then not reported
+    resource = None
 
 
-IGNORED_DIR_NAMES = {
-    '.git', '__pycache__', 'node_modules', 'venv', '.venv', 'build', 'dist', '.mypy_cache', '.pytest_cache'
-}
-
 DEFAULT_SCAN_ROOT = Path('crewai-repos')
 
+# Bump whenever extraction logic changes so stale cache entries are ignored.
+CACHE_VERSION = 6
 
-@dataclass
-class DefinitionInfo:
+DEFAULT_FILE_BUDGET_SEC = 10.0
+DEFAULT_MAX_FILE_BYTES = 5 * 1024 * 1024
+
+# Files indexed between two memory checks under a --memory-ceiling-mb.
+MEMORY_CHECK_EVERY_FILES = 16
+
+# Set by scan_repo for the duration of a repo scan when profiling (--profile).
+_profiler: Optional[PhaseProfiler] = None
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time a block under the given phase name when profiling; a no-op otherwise."""
+    return _profiler.phase(name) if _profiler is not None else nullcontext()
+
+
+def set_current_file(path: Optional[Path]) -> None:
+    if _profiler is not None:
+        _profiler.current_file = str(path) if path is not None else None
+
+
+class Record:
+    """Base for compact immutable records: slotted, picklable, and turned into the
+    report's JSON schema only when written out (see to_json / encode_record)."""
+    __slots__ = ()
+
+    def __reduce__(self):
+        # frozen dataclasses with hand-written __slots__ can't be restored by setattr
+        return (self.__class__, tuple(getattr(self, f) for f in self.__slots__))
+
+    def to_json(self) -> dict:
+        return {f: getattr(self, f) for f in self.__slots__}
+
+
+@dataclass(frozen=True)
+class DefinitionInfo(Record):
+    __slots__ = ('name', 'kind', 'module', 'file_path', 'doc_first_line', 'qualname')
     name: str
     kind: str  # 'class' | 'function'
     module: str
-    file_path: Path
+    file_path: str  # shared by all definitions of a file
     doc_first_line: Optional[str]
+    qualname: str
+
+
+@dataclass(frozen=True)
+class ToolRef(Record):
+    """One tool reference of an agent, in report field order."""
+    __slots__ = ('name', 'qualname', 'kind', 'defined_in', 'docstring')
+    name: str
+    qualname: Optional[str]
+    kind: str  # 'class' | 'function' | 'unknown'
+    defined_in: str  # absolute path | 'external' | 'unknown'
+    docstring: Optional[str]
+
+    @classmethod
+    def from_json(cls, d: dict) -> 'ToolRef':
+        return cls(
+            name=intern_opt(d['name']),
+            qualname=intern_opt(d['qualname']),
+            kind=sys.intern(d['kind']),
+            defined_in=sys.intern(d['defined_in']),
+            docstring=d['docstring'],
+        )
+
+
+@dataclass(frozen=True)
+class AgentRecord(Record):
+    """One agent, in report field order."""
+    __slots__ = ('name', 'framework', 'role', 'goal', 'llm', 'tools_used')
+    name: str
+    framework: Optional[str]  # AgentExtractor.framework; None unless --extractor differs from the default
+    role: Optional[str]
+    goal: Optional[str]
+    llm: Optional[str]
+    tools_used: Tuple[ToolRef, ...]
+
+    def to_json(self) -> dict:
+        doc = {'name': self.name}
+        if self.framework is not None:
+            doc['framework'] = self.framework
+        doc.update(
+            role=self.role,
+            goal=self.goal,
+            llm=self.llm,
+            tools_used=[t.to_json() for t in self.tools_used],
+        )
+        return doc
+
+    @classmethod
+    def from_json(cls, d: dict) -> 'AgentRecord':
+        return cls(
+            name=intern_opt(d['name']),
+            framework=intern_opt(d.get('framework')),
+            role=d['role'],
+            goal=d['goal'],
+            llm=intern_opt(d['llm']),
+            tools_used=tuple(ToolRef.from_json(t) for t in d['tools_used']),
+        )
+
+
+def intern_opt(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def encode_record(obj: object) -> dict:
+    """json.dumps default= hook serialising records to the report schema."""
+    if isinstance(obj, Record):
+        return obj.to_json()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+@lru_cache(maxsize=4096)
+def external_tool(name: str) -> ToolRef:
+    return ToolRef(name=name, qualname=None, kind='class', defined_in='external', docstring=None)
+
+
+@lru_cache(maxsize=4096)
+def unresolved_tool(name: str) -> ToolRef:
+    return ToolRef(name=name, qualname=None, kind='unknown', defined_in='unknown', docstring=None)
+
+
+@dataclass
+class ParsedFile:
+    """Source text and AST of one file, read and parsed at most once per scan.
+
+    src and tree are None when the file's definitions were served from the
+    parse cache or a previous scan's state; they are loaded lazily only if
+    its agents have to be extracted again.
+
+    record is the file's JSON-serialisable result as stored in the cache and
+    in state files: {'warning', 'definitions', 'import_aliases', 'symbols',
+    'star_imports'} plus 'agents' once known.
+    """
+    path: Path
+    module: str
+    src: Optional[str]
+    tree: Optional[ast.AST]
+    record: dict
+    digest: Optional[str] = None
+    lines: Optional[List[str]] = None  # src split once for source snippets; see source_lines
+
+    def source_lines(self) -> List[str]:
+        if self.lines is None:
+            self.lines = split_source_lines(self.src)
+        return self.lines
+
+
+@dataclass
+class RepoSnapshot:
+    """Per-file results of a repo scan, persisted between runs by --since-state.
+
+    Before a scan, unchanged lists the repo-relative paths known to be identical
+    to when files was recorded. The scan replaces files and index_digest with
+    its own results. dirty lists the tracked files that differed from head
+    when the scan started (None if git was not asked): their records are of
+    uncommitted content, which git cannot vouch for on the next run.
+    """
+    head: Optional[str] = None
+    index_digest: Optional[str] = None
+    files: Dict[str, dict] = field(default_factory=dict)
+    unchanged: Set[str] = field(default_factory=set)
+    dirty: Optional[Set[str]] = None
+
+
+@dataclass
+class ScanOptions:
+    cache_path: Optional[Path] = None  # None disables the parse cache
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    track_state: bool = False  # record a RepoSnapshot per repo (--since-state)
+    file_budget_sec: Optional[float] = DEFAULT_FILE_BUDGET_SEC
+    repo_budget_sec: Optional[float] = None
+    max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES
+    profile: bool = False  # collect per-phase timings (--profile)
+    slowest_files: int = DEFAULT_SLOWEST_FILES
+    llm_providers_path: Optional[Path] = None  # None: DEFAULT_PROVIDERS_PATH
+    walk: WalkOptions = field(default_factory=WalkOptions)
+    shard: Optional[Tuple[int, int]] = None  # (i, N) from --shard i/N: scan only that shard's repos
+    repo_names: Optional[FrozenSet[str]] = None  # from --framework: scan only repo directories with these names
+    extractors: Tuple[str, ...] = DEFAULT_EXTRACTORS  # --extractor: frameworks whose agents are extracted
+    memory_ceiling_bytes: Optional[int] = None  # --memory-ceiling-mb: index in two phases above this RSS
+
+
+@dataclass
+class Budget:
+    """Time and size limits applied while scanning one repo; None means unlimited.
+
+    deadline is an absolute time.time() value: the earlier of the overall scan
+    deadline and the repo's own budget.
+    """
+    deadline: Optional[float] = None
+    file_budget_sec: Optional[float] = None
+    max_file_bytes: Optional[int] = None
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() > self.deadline
+
+    def file_deadline(self) -> Optional[float]:
+        if self.file_budget_sec is None:
+            return self.deadline
+        end = time.time() + self.file_budget_sec
+        return end if self.deadline is None else min(end, self.deadline)
+
+
+class BudgetExceeded(Exception):
+    """Raised by extract_agents when its deadline passes; carries the agents found so far."""
+
+    def __init__(self, agents: List['AgentRecord']) -> None:
+        super().__init__(f'budget exceeded after {len(agents)} agents')
+        self.agents = agents
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process; the peak so far where the current one is not available."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far; None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+@dataclass
+class RepoResult:
+    entry: dict  # the repo's element of the report's 'repos' list
+    stats: dict  # the repo's contribution to the report's 'stats'
+    snapshot: Optional[dict] = None  # serialised RepoSnapshot when tracking state
+    timings: Optional[dict] = None  # PhaseProfiler.repo_timings() when profiling
 
 
 @dataclass
@@ -47,15 +312,19 @@ class WarningInfo:
     reason: str
 
 
-def iter_python_files(root: Path) -> List[Path]:
-    py_files: List[Path] = []
-    for dirpath, dirnames, filenames in os.walk(root):
-        # prune ignored directories in-place
-        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIR_NAMES]
-        for filename in filenames:
-            if filename.endswith('.py') and not filename.startswith('.'):  # skip dotfiles
-                py_files.append(Path(dirpath) / filename)
-    return py_files
+def iter_python_files(root: Path, walk: Optional[WalkOptions] = None) -> Iterator[Path]:
+    return iter_repo_files(root, walk)
+
+
+def timed_walk(files: Iterator[Path]) -> Iterator[Path]:
+    """Yield from a file walk, timing each step as the 'walk' phase."""
+    while True:
+        set_current_file(None)
+        with phase('walk'):
+            path = next(files, None)
+        if path is None:
+            return
+        yield path
 
 
 def module_name_for_file(repo_root: Path, file_path: Path) -> str:
@@ -71,51 +340,205 @@ def first_line_or_none(doc: Optional[str]) -> Optional[str]:
     return first[0].strip() if first else None
 
 
-def build_repo_symbol_index(repo_root: Path) -> Tuple[Dict[str, DefinitionInfo], Dict[Path, ast.AST], List[WarningInfo]]:
+def build_name_index(qual_index: Dict[str, DefinitionInfo]) -> Dict[str, List[DefinitionInfo]]:
+    """Reverse index of short name -> definitions carrying that name, in qual_index order."""
+    name_index: Dict[str, List[DefinitionInfo]] = {}
+    for defn in qual_index.values():
+        name_index.setdefault(defn.name, []).append(defn)
+    return name_index
+
+
+def collect_top_level_definitions(tree: ast.AST, module: str, file_path: Path) -> List[DefinitionInfo]:
+    defs: List[DefinitionInfo] = []
+    path_str = str(file_path)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            kind = 'class'
+        elif isinstance(node, ast.FunctionDef):
+            kind = 'function'
+        else:
+            continue
+        defs.append(DefinitionInfo(
+            name=node.name,
+            kind=kind,
+            module=module,
+            file_path=path_str,
+            doc_first_line=first_line_or_none(ast.get_docstring(node)),
+            qualname=f"{module}.{node.name}",
+        ))
+    return defs
+
+
+def file_cache_key(file_path: Path, digest: str) -> str:
+    return f"v{CACHE_VERSION}:file:{file_path}:{digest}"
+
+
+def agents_cache_key(file_path: Path, digest: str, index_digest: str) -> str:
+    return f"v{CACHE_VERSION}:agents:{file_path}:{digest}:{index_digest}"
+
+
+def symbol_index_digest(qual_index: Dict[str, DefinitionInfo], graph: ImportGraph, providers_digest: str = '', extractors: Tuple[str, ...] = DEFAULT_EXTRACTORS) -> str:
+    """Fingerprint of everything agent extraction sees beyond the file itself
+    and its agent configs: the repo's symbol index and import graph, the LLM
+    provider table and the selected extractors."""
+    payload = json.dumps([
+        [[qual, d.kind, d.file_path, d.doc_first_line] for qual, d in qual_index.items()],
+        graph.symbols,
+        graph.stars,
+        providers_digest,
+        list(extractors),
+    ], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def timed_import_aliases(tree: ast.AST) -> Dict[str, str]:
+    with phase('import_aliases'):
+        return collect_import_aliases(tree)
+
+
+def read_source(path: Path) -> str:
+    with path.open('r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def may_construct_agent(src: str) -> bool:
+    """Cheap pre-filter: False only if the source cannot contain an agent constructor call.
+
+    Every constructor an extractor matches is spelled somewhere in the file (the
+    call itself or the import it is aliased from), so a file with none of the
+    extractors' markers is ruled out. All registered extractors count, selected
+    or not, so the result can be cached with the file. Non-ASCII sources are
+    always kept because identifiers are NFKC-normalised.
+    """
+    return any(m in src for m in registered_markers()) or not src.isascii()
+
+
+def parse_file_record(tree: ast.AST, src: str, module: str, file_path: Path) -> dict:
+    symbols, star_imports = module_symbols(tree, module)
+    return {
+        'warning': None,
+        'agent_candidate': may_construct_agent(src),
+        'definitions': [
+            {'name': d.name, 'kind': d.kind, 'doc': d.doc_first_line}
+            for d in collect_top_level_definitions(tree, module, file_path)
+        ],
+        'import_aliases': timed_import_aliases(tree),
+        'symbols': symbols,
+        'star_imports': star_imports,
+    }
+
+
+def build_repo_symbol_index(repo_root: Path, cache: Optional[ParseCache] = None, snapshot: Optional[RepoSnapshot] = None, budget: Optional[Budget] = None, walk: Optional[WalkOptions] = None, memory_ceiling: Optional[int] = None, counters: Optional[Dict[str, int]] = None) -> Tuple[Dict[str, DefinitionInfo], Dict[str, List[DefinitionInfo]], Dict[Path, ParsedFile], List[WarningInfo]]:
     """Build index of top-level class/function definitions keyed by fully qualified qualname.
 
-    Returns: (qualname_to_def, file_to_ast, warnings)
+    A file is only parsed when no earlier result for it is available. Files in
+    snapshot.unchanged reuse their record from the previous scan without being
+    read; with a cache, files whose content hash is already known reuse the
+    cached record. If a snapshot is given, snapshot.files is replaced by this
+    scan's records. Files over budget.max_file_bytes, and every file once
+    budget.deadline has passed, are skipped with a warning.
+
+    The source and tree of files that may construct agents are normally kept
+    for extraction. Once the process's RSS is over memory_ceiling (bytes),
+    the repo is indexed in two phases instead: the sources and trees kept so
+    far are released and no more are kept, leaving only the compact
+    definition and import tables; parse_repo then reads and parses each
+    candidate file again, one at a time. counters['repos_two_phase'] is set
+    to 1 if that happened.
+
+    Returns: (qualname_to_def, name_to_defs, parsed_files, warnings)
     """
     qual_to_def: Dict[str, DefinitionInfo] = {}
-    file_to_ast: Dict[Path, ast.AST] = {}
+    parsed_files: Dict[Path, ParsedFile] = {}
     warnings: List[WarningInfo] = []
+    snapshot_files: Dict[str, dict] = {}
+    keep_trees = True
+
+    # Files are indexed as the walk finds them
+    for i, py in enumerate(timed_walk(iter_python_files(repo_root, walk))):
+        set_current_file(py)
+        if keep_trees and memory_ceiling is not None and i % MEMORY_CHECK_EVERY_FILES == 0:
+            rss = current_rss_bytes()
+            if rss is not None and rss > memory_ceiling:
+                keep_trees = False
+                for parsed in parsed_files.values():
+                    parsed.src = parsed.tree = None
+                if counters is not None:
+                    counters['repos_two_phase'] = 1
+        module = module_name_for_file(repo_root, py)
+        rel = py.relative_to(repo_root).as_posix()
+        src = None
+        tree = None
+        digest = None
+        record = None
+
+        if budget is not None:
+            if budget.expired():
+                warnings.append(WarningInfo(file=str(py), reason='Skipped: repo time budget exhausted before indexing'))
+                continue
+            if budget.max_file_bytes is not None:
+                try:
+                    size = py.stat().st_size
+                except OSError:
+                    size = 0
+                if size > budget.max_file_bytes:
+                    warnings.append(WarningInfo(file=str(py), reason=f'Skipped: file is {size} bytes, over the {budget.max_file_bytes} byte limit'))
+                    continue
 
-    for py in iter_python_files(repo_root):
-        try:
-            with py.open('r', encoding='utf-8', errors='replace') as f:
-                src = f.read()
-            tree = ast.parse(src)
-            file_to_ast[py] = tree
-        except SyntaxError as e:
-            warnings.append(WarningInfo(file=str(py), reason=f'SyntaxError: {e.msg}'))
+        if snapshot is not None and rel in snapshot.unchanged:
+            record = snapshot.files.get(rel)
+
+        if record is None:
+            try:
+                with phase('read'):
+                    src = read_source(py)
+            except Exception as e:  # unforeseen read errors
+                warnings.append(WarningInfo(file=str(py), reason=f'ParseError: {e}'))
+                continue
+            if cache is not None:
+                digest = hashlib.sha256(src.encode('utf-8', 'surrogatepass')).hexdigest()
+                record = cache.get(file_cache_key(py, digest))
+
+        if record is None:
+            try:
+                with phase('parse'):
+                    tree = ast.parse(src)
+                with phase('index'):
+                    record = parse_file_record(tree, src, module, py)
+            except SyntaxError as e:
+                record = {'warning': f'SyntaxError: {e.msg}', 'definitions': []}
+            except Exception as e:  # unforeseen parse errors
+                record = {'warning': f'ParseError: {e}', 'definitions': []}
+            if cache is not None:
+                cache.put(file_cache_key(py, digest), record)
+
+        if snapshot is not None:
+            snapshot_files[rel] = record
+        if record['warning'] is not None:
+            warnings.append(WarningInfo(file=str(py), reason=record['warning']))
             continue
-        except Exception as e:  # unforeseen read/parse errors
-            warnings.append(WarningInfo(file=str(py), reason=f'ParseError: {e}'))
-            continue
-
-        module = module_name_for_file(repo_root, py)
 
-        for node in tree.body:
-            if isinstance(node, ast.ClassDef):
-                qual = f"{module}.{node.name}"
-                qual_to_def[qual] = DefinitionInfo(
-                    name=node.name,
-                    kind='class',
-                    module=module,
-                    file_path=py,
-                    doc_first_line=first_line_or_none(ast.get_docstring(node)),
-                )
-            elif isinstance(node, ast.FunctionDef):
-                qual = f"{module}.{node.name}"
-                qual_to_def[qual] = DefinitionInfo(
-                    name=node.name,
-                    kind='function',
-                    module=module,
-                    file_path=py,
-                    doc_first_line=first_line_or_none(ast.get_docstring(node)),
-                )
-
-    return qual_to_def, file_to_ast, warnings
+        if not keep_trees or not record.get('agent_candidate', True):
+            # Only needed for the symbol index (or re-read in the second
+            # phase); don't hold its source and tree.
+            src = tree = None
+        parsed_files[py] = ParsedFile(path=py, module=module, src=src, tree=tree, record=record, digest=digest)
+        path_str = str(py)
+        for d in record['definitions']:
+            qual = f"{module}.{d['name']}"
+            qual_to_def[qual] = DefinitionInfo(
+                name=sys.intern(d['name']),
+                kind=sys.intern(d['kind']),
+                module=module,
+                file_path=path_str,
+                doc_first_line=d['doc'],
+                qualname=qual,
+            )
+
+    set_current_file(None)
+    if snapshot is not None:
+        snapshot.files = snapshot_files
+    return qual_to_def, build_name_index(qual_to_def), parsed_files, warnings
 
 
 def collect_import_aliases(tree: ast.AST) -> Dict[str, str]:
@@ -143,51 +566,86 @@ def collect_import_aliases(tree: ast.AST) -> Dict[str, str]:
     return aliases
 
 
-def is_agent_constructor(func: ast.AST, import_aliases: Dict[str, str]) -> bool:
-    # Name("Agent") or Name(alias) where alias resolves to crewai.Agent
-    if isinstance(func, ast.Name):
-        target = import_aliases.get(func.id)
-        if target == 'crewai.Agent':
-            return True
-        if func.id == 'Agent':
-            # Could be direct from crewai import Agent without alias resolution
-            return True
-        return False
-    # crewai.Agent or alias.Agent
-    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
-        mod = import_aliases.get(func.value.id, func.value.id)
-        full = f"{mod}.{func.attr}"
-        return full == 'crewai.Agent'
-    return False
-
-
-def extract_str_or_snippet(node: Optional[ast.AST], src: str) -> Optional[str]:
+def split_source_lines(src: str) -> List[str]:
+    # On the line breaks ast counts
+    return re.split(r'\r\n|\r|\n', src)
+
+
+def source_segment(lines: List[str], node: ast.AST) -> Optional[str]:
+    """Source text of node in the file split into lines (see split_source_lines);
+    like ast.get_source_segment without re-splitting the source per call."""
+    lineno, end_lineno = getattr(node, 'lineno', None), getattr(node, 'end_lineno', None)
+    col, end_col = getattr(node, 'col_offset', None), getattr(node, 'end_col_offset', None)
+    if None in (lineno, end_lineno, col, end_col):
+        return None
+    if end_lineno > len(lines):
+        return None
+    # Column offsets count UTF-8 bytes
+    first = lines[lineno - 1].encode('utf-8', 'surrogatepass')
+    if lineno == end_lineno:
+        return first[col:end_col].decode('utf-8', 'replace')
+    last = lines[end_lineno - 1].encode('utf-8', 'surrogatepass')
+    return '\n'.join([first[col:].decode('utf-8', 'replace'), *lines[lineno:end_lineno - 1], last[:end_col].decode('utf-8', 'replace')])
+
+
+def extract_str_or_snippet(node: Optional[ast.AST], lines: List[str]) -> Optional[str]:
     if node is None:
         return None
     if isinstance(node, ast.Constant) and isinstance(node.value, str):
         return node.value
-    # Fallback to raw source slice
-    try:
-        return src[node.col_offset: node.end_col_offset] if hasattr(node, 'col_offset') and hasattr(node, 'end_col_offset') else None
-    except Exception:
-        return None
+    # Fallback to raw source text
+    return source_segment(lines, node)
+
+
+def guess_llm_label(value: Optional[str], providers: Optional[ProviderRegistry] = None) -> Optional[str]:
+    return (providers or registry_for()).classify(value)
 
 
-def guess_llm_label(value: Optional[str]) -> Optional[str]:
-    if not value:
+def constant_str(node: Optional[ast.AST], current_module: str, graph: Optional[ImportGraph] = None, values: Optional[Dict[str, ast.AST]] = None) -> Optional[str]:
+    """The string node stands for: a literal, or a name bound to one in the file or (via graph) the repo."""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, str) else None
+    expr = dotted_name(node) if node is not None else None
+    if expr is None:
         return None
-    v = value.lower()
-    if any(k in v for k in ['gpt', 'o1', 'o3']):
-        return f"openai:{value}"
-    if 'claude' in v:
-        return f"anthropic:{value}"
-    if 'gemini' in v:
-        return f"google:{value}"
-    if 'llama' in v or 'ollama' in v:
-        return f"ollama:{value}"
-    if 'mistral' in v:
-        return f"mistral:{value}"
-    return 'unknown'
+    if values is not None and isinstance(values.get(expr), ast.Constant):
+        return constant_str(values[expr], current_module)
+    if graph is not None:
+        binding = graph.locate(current_module, expr)
+        if binding is not None and binding[0] == 'const':
+            return binding[1]
+    return None
+
+
+def llm_label_for_value(node: Optional[ast.AST], lines: List[str], current_module: str, providers: ProviderRegistry, graph: Optional[ImportGraph] = None, values: Optional[Dict[str, ast.AST]] = None, seen: frozenset = frozenset()) -> Optional[str]:
+    """LLM label for an Agent's llm= value.
+
+    Follows constructor calls (ChatOpenAI(model=...), Ollama(...), LLM(model=...))
+    and names bound to them or to string constants, in the file (values) or
+    through graph anywhere in the repo. Anything else, or anything those leave
+    'unknown', is classified from its source text as before.
+    """
+    label = None
+    if isinstance(node, ast.Call):
+        callee = dotted_name(node.func)
+        model_node = find_arg(node, list(MODEL_KEYWORDS))
+        if model_node is None and node.args:
+            model_node = node.args[0]
+        model = constant_str(model_node, current_module, graph, values)
+        label = providers.classify_call(callee.rsplit('.', 1)[-1] if callee else None, model)
+    elif node is not None and not isinstance(node, ast.Constant):
+        expr = dotted_name(node)
+        if expr is not None and values is not None and expr in values and expr not in seen:
+            label = llm_label_for_value(values[expr], lines, current_module, providers, graph, values, seen | {expr})
+        elif expr is not None and graph is not None:
+            binding = graph.locate(current_module, expr)
+            if binding is not None and binding[0] == 'const':
+                label = providers.classify(binding[1])
+            elif binding is not None and binding[0] == 'call':
+                label = providers.classify_call(binding[1].rsplit('.', 1)[-1], binding[2] if len(binding) > 2 else None)
+    if label is not None and label != 'unknown':
+        return label
+    return providers.classify(extract_str_or_snippet(node, lines))
 
 
 def find_arg(call: ast.Call, names: List[str]) -> Optional[ast.AST]:
@@ -199,7 +657,7 @@ def find_arg(call: ast.Call, names: List[str]) -> Optional[ast.AST]:
     return None
 
 
-def resolve_symbol_in_repo(symbol: str, import_aliases: Dict[str, str], current_module: str, qual_index: Dict[str, DefinitionInfo]) -> Optional[DefinitionInfo]:
+def resolve_symbol_in_repo(symbol: str, import_aliases: Dict[str, str], current_module: str, qual_index: Dict[str, DefinitionInfo], name_index: Optional[Dict[str, List[DefinitionInfo]]] = None) -> Optional[DefinitionInfo]:
     # Try current module first
     cand = f"{current_module}.{symbol}"
     if cand in qual_index:
@@ -220,42 +678,43 @@ def resolve_symbol_in_repo(symbol: str, import_aliases: Dict[str, str], current_
             pass
 
     # Try any module in index that ends with .symbol (unique heuristic)
-    suffix = f".{symbol}"
-    matches = [d for q, d in qual_index.items() if q.endswith(suffix)]
+    if name_index is not None and '.' not in symbol:
+        # qualnames are module + '.' + a dot-free name, so for a dot-free symbol
+        # "ends with .symbol" is exactly "name == symbol".
+        matches = name_index.get(symbol, [])
+    else:
+        suffix = f".{symbol}"
+        matches = [d for q, d in qual_index.items() if q.endswith(suffix)]
     if len(matches) == 1:
         return matches[0]
     return None
 
 
-def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], current_module: str, qual_index: Dict[str, DefinitionInfo]) -> List[dict]:
-    tools: List[dict] = []
+def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], current_module: str, qual_index: Dict[str, DefinitionInfo], name_index: Optional[Dict[str, List[DefinitionInfo]]] = None, graph: Optional[ImportGraph] = None, local_bindings: Optional[Dict[str, list]] = None) -> List[ToolRef]:
+    """Tool references in an Agent's tools= value.
+
+    With a graph, names are first followed through the repo's imports and
+    variable bindings (local_bindings adds the current file's function-level
+    ones); whatever they cannot settle falls back to the name heuristics of
+    resolve_symbol_in_repo.
+    """
+    tools: List[ToolRef] = []
 
     def record_external(name: str) -> None:
-        tools.append({
-            'name': name,
-            'qualname': None,
-            'kind': 'class',
-            'defined_in': 'external',
-            'docstring': None,
-        })
+        tools.append(external_tool(name))
 
     def record_unresolved(name: str) -> None:
-        tools.append({
-            'name': name,
-            'qualname': None,
-            'kind': 'unknown',
-            'defined_in': 'unknown',
-            'docstring': None,
-        })
+        tools.append(unresolved_tool(name))
 
     def record_def(defn: DefinitionInfo) -> None:
-        tools.append({
-            'name': defn.name,
-            'qualname': f"{defn.module}.{defn.name}",
-            'kind': defn.kind,
-            'defined_in': str(defn.file_path),
-            'docstring': defn.doc_first_line,
-        })
+        # All strings are shared with the definition; only the record is new.
+        tools.append(ToolRef(
+            name=defn.name,
+            qualname=defn.qualname,
+            kind=defn.kind,
+            defined_in=defn.file_path,
+            docstring=defn.doc_first_line,
+        ))
 
     def handle_symbol(name: str) -> None:
         # crewai_tools import detection
@@ -264,7 +723,7 @@ def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], cur
             record_external(name)
             return
 
-        defn = resolve_symbol_in_repo(name, import_aliases, current_module, qual_index)
+        defn = resolve_symbol_in_repo(name, import_aliases, current_module, qual_index, name_index)
         if defn:
             record_def(defn)
         else:
@@ -278,7 +737,18 @@ def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], cur
         nodes = [value]
 
     for node in nodes:
-        if isinstance(node, ast.Call):
+        expr = dotted_name(node.func if isinstance(node, ast.Call) else node) if graph is not None else None
+        if expr is not None:
+            for kind, name in graph.resolve(current_module, expr, local_bindings):
+                if kind == 'def':
+                    record_def(qual_index[name])
+                elif kind == 'external':
+                    record_external(name)
+                elif kind == 'unresolved':
+                    record_unresolved(name)
+                else:
+                    handle_symbol(name)
+        elif isinstance(node, ast.Call):
             # Tool instantiated: FooTool(...)
             fn = node.func
             if isinstance(fn, ast.Name):
@@ -292,13 +762,7 @@ def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], cur
                     handle_symbol(fn.attr)
             else:
                 # complex call expression
-                tools.append({
-                    'name': getattr(getattr(node.func, 'id', None), 'id', None) or 'unknown',
-                    'qualname': None,
-                    'kind': 'unknown',
-                    'defined_in': 'unknown',
-                    'docstring': None,
-                })
+                record_unresolved(getattr(getattr(node.func, 'id', None), 'id', None) or 'unknown')
         elif isinstance(node, ast.Name):
             # Bare function ref or class ref
             handle_symbol(node.id)
@@ -311,146 +775,616 @@ def extract_tools_from_value(value: ast.AST, import_aliases: Dict[str, str], cur
                 handle_symbol(node.attr)
         else:
             # Unknown expression
-            tools.append({
-                'name': 'unknown',
-                'qualname': None,
-                'kind': 'unknown',
-                'defined_in': 'unknown',
-                'docstring': None,
-            })
+            record_unresolved('unknown')
 
     return tools
 
 
-def parse_repo(repo_root: Path) -> Tuple[List[dict], List[WarningInfo], int]:
-    """Parse a single repo; returns (agents, warnings, files_parsed_count)."""
-    qual_index, file_to_ast, warnings = build_repo_symbol_index(repo_root)
-    agents: List[dict] = []
+def field_text(value: Union[ast.AST, str, None], lines: List[str]) -> Optional[str]:
+    return value if isinstance(value, str) else extract_str_or_snippet(value, lines)
+
+
+def extract_agents(tree: ast.AST, src: str, current_module: str, qual_index: Dict[str, DefinitionInfo], name_index: Optional[Dict[str, List[DefinitionInfo]]] = None, deadline: Optional[float] = None, graph: Optional[ImportGraph] = None, providers: Optional[ProviderRegistry] = None, extractors: Optional[ExtractorSet] = None, file_path: Optional[Path] = None, configs: Optional[Dict[str, str]] = None, lines: Optional[List[str]] = None) -> List[AgentRecord]:
+    """Extract agent records from one parsed file, in source order.
+
+    lines is src already split by split_source_lines (see ParsedFile.source_lines);
+    it is split here if not given.
+
+    One ExtractionVisitor pass finds the calls of every selected extractor
+    (default: CrewAI) along with the file's bindings; fields are then taken
+    from the matched calls only. The agent config files read (see
+    agent_extractors.py), with their content hashes, are added to configs.
+    Records carry their framework only when extractors is not the default set.
+
+    Raises BudgetExceeded, carrying the agents found so far, once deadline passes.
+    """
+    agents: List[AgentRecord] = []
+    providers = providers or registry_for()
+    lines = lines if lines is not None else split_source_lines(src)
+    import_aliases = timed_import_aliases(tree)
+    extractors = extractors or extractor_set()
+    # The report schema only gains 'framework' when other frameworks are asked for.
+    tag_framework = extractors.names != DEFAULT_EXTRACTORS
+    visitor = ExtractionVisitor(current_module, extractors, import_aliases, deadline)
+    try:
+        visitor.visit(tree)
+    except DeadlinePassed:
+        raise BudgetExceeded(agents)
+    ctx = ExtractionContext(src, file_path, visitor.values, configs if configs is not None else {})
+
+    for node, extractor in visitor.matches:
+        if deadline is not None and time.time() > deadline:
+            raise BudgetExceeded(agents)
+        fields: AgentFields = extractor.fields(node, ctx)
+        # Assignment/return target name if present, else the one passed, else a generic name
+        name = visitor.names.get(node) or fields.name or 'agent'
+
+        if isinstance(fields.llm, str):
+            llm_label = providers.classify(fields.llm)
+        else:
+            llm_label = llm_label_for_value(fields.llm, lines, current_module, providers, graph, visitor.values)
+
+        tools_used: List[ToolRef] = []
+        if fields.tools is not None:
+            with phase('resolve_tools'):
+                tools_used = extract_tools_from_value(fields.tools, import_aliases, current_module, qual_index, name_index, graph, visitor.bindings)
+
+        agents.append(AgentRecord(
+            name=name,
+            framework=extractor.framework if tag_framework else None,
+            role=field_text(fields.role, lines),
+            goal=field_text(fields.goal, lines),
+            llm=llm_label,
+            tools_used=tuple(tools_used),
+        ))
+
+    return agents
+
+
+def configs_unchanged(configs: Dict[str, str]) -> bool:
+    """Whether every agent config a file's extraction read still has the recorded content."""
+    return all(config_digest(Path(path)) == digest for path, digest in configs.items())
+
+
+def parse_repo(repo_root: Path, cache: Optional[ParseCache] = None, snapshot: Optional[RepoSnapshot] = None, budget: Optional[Budget] = None, providers: Optional[ProviderRegistry] = None, walk: Optional[WalkOptions] = None, extractors: Tuple[str, ...] = DEFAULT_EXTRACTORS, memory_ceiling: Optional[int] = None) -> Tuple[List[AgentRecord], List[WarningInfo], int, Dict[str, int]]:
+    """Parse a single repo; returns (agents, warnings, files_parsed_count, counters).
+
+    counters holds extra per-repo stats: files_prefiltered counts files that
+    may_construct_agent ruled out, whose agent extraction was skipped, and
+    with a memory_ceiling, repos_two_phase is 1 if the repo was indexed in
+    two phases (see build_repo_symbol_index). Either way the results are the
+    same.
+
+    A file's earlier agents (from the snapshot or the cache) are reused when
+    neither its content, the agent configs it read nor the repo's symbol
+    index, which tool resolution depends on, has changed. If a snapshot is given it is updated in place with
+    this scan's per-file records and index digest.
+
+    With a budget, files left when the repo deadline passes are skipped and a
+    file whose extraction overruns its per-file budget keeps only the agents
+    found so far; both are reported as warnings.
+    """
+    counters = {'files_prefiltered': 0}
+    if memory_ceiling is not None:
+        counters['repos_two_phase'] = 0
+    qual_index, name_index, parsed_files, warnings = build_repo_symbol_index(repo_root, cache, snapshot, budget, walk, memory_ceiling, counters)
+    with phase('import_graph'):
+        graph = ImportGraph(qual_index)
+        for parsed in parsed_files.values():
+            graph.add_module(parsed.module, parsed.record.get('symbols', {}), parsed.record.get('star_imports', []))
+    providers = providers or registry_for()
+    selected = extractor_set(extractors)
+    index_digest = symbol_index_digest(qual_index, graph, providers.digest, selected.names) if cache is not None or snapshot is not None else None
+    reuse_snapshot_agents = snapshot is not None and snapshot.index_digest == index_digest
+    agents: List[AgentRecord] = []
     files_parsed = 0
 
-    for file_path, tree in file_to_ast.items():
+    # Pop each record as it is processed so its source and tree can be freed
+    # as soon as the file's agents have been extracted.
+    for file_path in list(parsed_files):
+        parsed = parsed_files.pop(file_path)
+        record = parsed.record
+        set_current_file(file_path)
+        if budget is not None and budget.expired():
+            warnings.append(WarningInfo(file=str(file_path), reason='Skipped: repo time budget exhausted before agent extraction'))
+            record.pop('agents', None)
+            continue
         files_parsed += 1
+
+        if not record.get('agent_candidate', True):
+            counters['files_prefiltered'] += 1
+            record['agents'] = []
+            record.pop('agent_configs', None)
+            continue
+
+        if reuse_snapshot_agents and 'agents' in record and configs_unchanged(record.get('agent_configs', {})):
+            agents.extend(AgentRecord.from_json(a) for a in record['agents'])
+            continue
+
+        key = None
+        if cache is not None:
+            if parsed.digest is None:
+                with phase('read'):
+                    parsed.src = read_source(file_path)
+                parsed.digest = hashlib.sha256(parsed.src.encode('utf-8', 'surrogatepass')).hexdigest()
+            key = agents_cache_key(file_path, parsed.digest, index_digest)
+            cached = cache.get(key)
+            if cached is not None and configs_unchanged(cached['agent_configs']):
+                if snapshot is not None:
+                    record['agents'] = cached['agents']
+                    record['agent_configs'] = cached['agent_configs']
+                agents.extend(AgentRecord.from_json(a) for a in cached['agents'])
+                continue
+
+        if parsed.src is None:
+            with phase('read'):
+                parsed.src = read_source(file_path)
+        src = parsed.src
+        tree = parsed.tree
+        deadline = budget.file_deadline() if budget is not None else None
+        configs: Dict[str, str] = {}
         try:
-            with file_path.open('r', encoding='utf-8', errors='replace') as f:
-                src = f.read()
-        except Exception as e:
-            warnings.append(WarningInfo(file=str(file_path), reason=f'ReadError: {e}'))
+            if tree is None:
+                with phase('parse'):
+                    tree = ast.parse(src)
+            with phase('extract_agents'):
+                file_agents = extract_agents(tree, src, parsed.module, qual_index, name_index, deadline, graph, providers, selected, file_path, configs, parsed.source_lines())
+        except RecursionError:
+            # Too deeply nested for a recursive helper; one file must not end the run.
+            warnings.append(WarningInfo(file=str(file_path), reason='ParseError: maximum recursion depth exceeded'))
+            record.pop('agents', None)
+            continue
+        except BudgetExceeded as e:
+            # Partial results are reported but never cached or recorded in the snapshot.
+            warnings.append(WarningInfo(file=str(file_path), reason=f'Truncated: time budget exceeded after {len(e.agents)} agents'))
+            record.pop('agents', None)
+            agents.extend(e.agents)
             continue
+        if key is not None or snapshot is not None:
+            file_agents_json = [a.to_json() for a in file_agents]
+            if key is not None:
+                cache.put(key, {'agents': file_agents_json, 'agent_configs': configs})
+            if snapshot is not None:
+                record['agents'] = file_agents_json
+                record['agent_configs'] = configs
+        agents.extend(file_agents)
+        del parsed, src, tree
+
+    set_current_file(None)
+    if snapshot is not None:
+        snapshot.index_digest = index_digest
+    return agents, warnings, files_parsed, counters
+
+
+def new_stats() -> dict:
+    return {
+        'repos_scanned': 0,
+        'files_parsed': 0,
+        'agents_found': 0,
+        'tools_resolved': 0,
+        'errors': 0,
+        'skipped': 0,
+        'files_prefiltered': 0,
+    }
+
+
+def git_output(repo_root: Path, *args: str) -> Optional[str]:
+    try:
+        proc = subprocess.run(['git', '-C', str(repo_root), *args], capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def git_unchanged_files(repo_root: Path, since: str) -> Optional[Set[str]]:
+    """Tracked files identical to commit since, in both HEAD and the working tree.
+
+    Returns None when git cannot answer (not a repo, unknown commit, ...).
+    """
+    tracked = git_output(repo_root, 'ls-files', '-z')
+    changed = git_output(repo_root, 'diff', '--name-only', '--no-renames', '-z', since, '--')
+    if tracked is None or changed is None:
+        return None
+    return set(tracked.split('\0')) - set(changed.split('\0')) - {''}
+
+
+def git_dirty_files(repo_root: Path) -> Optional[Set[str]]:
+    """Tracked files whose working tree or index content differs from HEAD; None when git cannot answer."""
+    changed = git_output(repo_root, 'diff', '--name-only', '--no-renames', '-z', 'HEAD', '--')
+    return set(changed.split('\0')) - {''} if changed is not None else None
+
+
+def load_snapshot(repo_root: Path, previous: Optional[dict], unchanged: Optional[Set[str]] = None) -> RepoSnapshot:
+    """Snapshot to scan a repo with; files are reusable only if git vouches they are unchanged.
+
+    git compares the working tree with the previous scan's HEAD, so files that
+    were dirty during that scan are never reusable: reverting them would make
+    them match the commit again but not what was scanned. A previous snapshot
+    without a dirty list is not reused at all.
+
+    A caller that tracks changes itself passes the unchanged repo-relative
+    paths instead, and git is not asked.
+    """
+    snapshot = RepoSnapshot(head=(git_output(repo_root, 'rev-parse', 'HEAD') or '').strip() or None)
+    if unchanged is None and snapshot.head:
+        snapshot.dirty = git_dirty_files(repo_root)
+    if previous and unchanged is None and previous.get('head') and snapshot.head and previous.get('dirty') is not None:
+        unchanged = git_unchanged_files(repo_root, previous['head'])
+        if unchanged is not None:
+            unchanged -= set(previous['dirty'])
+    if previous and unchanged is not None:
+        snapshot.index_digest = previous.get('index_digest')
+        snapshot.files = previous.get('files', {})
+        snapshot.unchanged = unchanged
+    return snapshot
+
+
+def is_skip_reason(reason: str) -> bool:
+    return reason.startswith(('Skipped:', 'Truncated:'))
+
+
+def skipped_repo_result(repo_root: Path) -> RepoResult:
+    """Placeholder entry recording a repo the overall timeout left unscanned."""
+    entry = {
+        'repo_path': str(repo_root),
+        'agents': [],
+        'warnings': [{'file': str(repo_root), 'reason': 'Skipped: overall timeout reached before the repo was scanned'}],
+    }
+    return RepoResult(entry=entry, stats={'skipped': 1})
+
+
+def scan_repo(repo_root: Path, options: Optional[ScanOptions] = None, previous: Optional[dict] = None, deadline: Optional[float] = None, unchanged: Optional[Set[str]] = None) -> RepoResult:
+    """Parse a single repo into its report entry and its contribution to stats.
+
+    previous is the repo's snapshot from the last --since-state run, if any;
+    deadline is the overall scan deadline, if any. unchanged, if given, lists
+    the files known not to have changed since previous (see load_snapshot).
+    """
+    global _profiler
+    options = options or ScanOptions()
+    _profiler = PhaseProfiler() if options.profile else None
+    try:
+        return _scan_repo(repo_root, options, previous, deadline, unchanged)
+    finally:
+        _profiler = None
+
+
+def _scan_repo(repo_root: Path, options: ScanOptions, previous: Optional[dict], deadline: Optional[float], unchanged: Optional[Set[str]] = None) -> RepoResult:
+    start = time.perf_counter()
+    if options.repo_budget_sec is not None:
+        repo_deadline = time.time() + options.repo_budget_sec
+        deadline = repo_deadline if deadline is None else min(deadline, repo_deadline)
+    budget = Budget(deadline=deadline, file_budget_sec=options.file_budget_sec, max_file_bytes=options.max_file_bytes)
+    snapshot = None
+    if options.track_state:
+        with phase('git'):
+            snapshot = load_snapshot(repo_root, previous, unchanged)
+    providers = registry_for(options.llm_providers_path)
+    cache_stats: Dict[str, int] = {}
+    if options.cache_path is not None:
+        with ParseCache(options.cache_path, options.cache_max_bytes) as cache:
+            agents, warnings, files_parsed, counters = parse_repo(repo_root, cache, snapshot, budget, providers, options.walk, options.extractors, options.memory_ceiling_bytes)
+        cache_stats = {'cache_hits': cache.hits, 'cache_misses': cache.misses}
+    else:
+        agents, warnings, files_parsed, counters = parse_repo(repo_root, snapshot=snapshot, budget=budget, providers=providers, walk=options.walk, extractors=options.extractors, memory_ceiling=options.memory_ceiling_bytes)
+
+    tools_resolved = sum(
+        sum(1 for t in a.tools_used if t.defined_in not in ('unknown', None))
+        for a in agents
+    )
+
+    entry = {
+        'repo_path': str(repo_root),
+        'agents': agents,
+        'warnings': [{'file': w.file, 'reason': w.reason} for w in warnings],
+    }
+    stats = {
+        'repos_scanned': 1,
+        'files_parsed': files_parsed,
+        'agents_found': len(agents),
+        'tools_resolved': tools_resolved,
+        'errors': len([w for w in warnings if 'Error' in w.reason or 'SyntaxError' in w.reason]),
+        'skipped': len([w for w in warnings if is_skip_reason(w.reason)]),
+        **counters,
+        **cache_stats,
+    }
+    if options.memory_ceiling_bytes is not None:
+        peak = peak_rss_bytes()
+        if peak is not None:
+            # The worker process's peak so far; the report keeps the maximum
+            stats['peak_rss_mb'] = -(-peak // (1024 * 1024))
+    snapshot_doc = None
+    if snapshot is not None:
+        snapshot_doc = {
+            'head': snapshot.head,
+            'index_digest': snapshot.index_digest,
+            'files': snapshot.files,
+            'dirty': sorted(snapshot.dirty) if snapshot.dirty is not None else None,
+        }
+    timings = None
+    if _profiler is not None:
+        timings = _profiler.repo_timings(str(repo_root), time.perf_counter() - start, options.slowest_files)
+    return RepoResult(entry=entry, stats=stats, snapshot=snapshot_doc, timings=timings)
+
+
+def scan_repo_before_deadline(repo_root: Path, deadline: float, options: Optional[ScanOptions] = None, previous: Optional[dict] = None) -> Optional[RepoResult]:
+    """Worker entry point: scan the repo unless the overall deadline has already passed."""
+    if time.time() > deadline:
+        return None
+    return scan_repo(repo_root, options, previous, deadline)
+
 
-        import_aliases = collect_import_aliases(tree)
-        current_module = module_name_for_file(repo_root, file_path)
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and is_agent_constructor(node.func, import_aliases):
-                name = None
-                # Best-effort: find assignment target name if present
-                parent_assign = None
-                for parent in getattr(tree, 'body', []):
-                    if isinstance(parent, (ast.Assign, ast.AnnAssign)) and getattr(parent, 'value', None) is node:
-                        parent_assign = parent
-                        break
-                if isinstance(parent_assign, ast.Assign) and parent_assign.targets:
-                    t0 = parent_assign.targets[0]
-                    if isinstance(t0, ast.Name):
-                        name = t0.id
-                elif isinstance(parent_assign, ast.AnnAssign) and isinstance(parent_assign.target, ast.Name):
-                    name = parent_assign.target.id
-                if name is None:
-                    # fallback generic name
-                    name = 'agent'
-
-                role_node = find_arg(node, ['role'])
-                goal_node = find_arg(node, ['goal'])
-                llm_node = find_arg(node, ['llm', 'model'])
-                tools_node = find_arg(node, ['tools', 'tool', 'toolkit'])
-
-                role_val = extract_str_or_snippet(role_node, src)
-                goal_val = extract_str_or_snippet(goal_node, src)
-                llm_val_raw = extract_str_or_snippet(llm_node, src)
-                llm_label = guess_llm_label(llm_val_raw)
-
-                tools_used: List[dict] = []
-                if tools_node is not None:
-                    tools_used = extract_tools_from_value(tools_node, import_aliases, current_module, qual_index)
-
-                agents.append({
-                    'name': name,
-                    'role': role_val,
-                    'goal': goal_val,
-                    'llm': llm_label,
-                    'tools_used': tools_used,
-                })
-
-    return agents, warnings, files_parsed
-
-
-def parse_all(scan_root: Path, overall_timeout_sec: int = 300) -> dict:
-    start = time.time()
+def merge_repo_result(result: dict, repo_result: RepoResult) -> None:
+    result['repos'].append(repo_result.entry)
+    add_stats(result['stats'], repo_result.stats)
 
+
+def shard_of(repo_dir: Path, count: int) -> int:
+    """1-based shard of a repo among count shards.
+
+    It is a hash of the directory name, so it is the same on every node and
+    in every Python process, whatever the scan root.
+    """
+    digest = hashlib.sha1(repo_dir.name.encode('utf-8', 'surrogatepass')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def iter_repo_dirs(scan_root: Path, shard: Optional[Tuple[int, int]] = None, names: Optional[FrozenSet[str]] = None) -> List[Path]:
+    repo_dirs = [child for child in sorted(scan_root.iterdir()) if child.is_dir()]
+    if names is not None:
+        repo_dirs = [d for d in repo_dirs if d.name in names]
+    if shard is not None:
+        index, count = shard
+        repo_dirs = [d for d in repo_dirs if shard_of(d, count) == index]
+    return repo_dirs
+
+
+def iter_repo_results(scan_root: Path, overall_timeout_sec: int = 300, jobs: int = 1, options: Optional[ScanOptions] = None, state: Optional[dict] = None) -> Iterator[RepoResult]:
+    """Yield each repo's RepoResult in sorted order, as soon as the repo is parsed.
+
+    state maps repo_path -> snapshot from a previous run (see load_state); it
+    is updated in place with the new snapshot of every repo scanned.
+    """
+    deadline = time.time() + overall_timeout_sec
+    repo_dirs = iter_repo_dirs(scan_root, options.shard, options.repo_names) if options is not None else iter_repo_dirs(scan_root)
+    previous = state if state is not None else {}
+
+    def remember(repo_result: RepoResult) -> RepoResult:
+        if state is not None and repo_result.snapshot is not None:
+            state[repo_result.entry['repo_path']] = repo_result.snapshot
+        return repo_result
+
+    if jobs <= 1:
+        for repo_root in repo_dirs:
+            if time.time() > deadline:
+                yield skipped_repo_result(repo_root)
+                continue
+            yield remember(scan_repo(repo_root, options, previous.get(str(repo_root)), deadline))
+        return
+
+    # Repos are submitted in sorted order and yielded back in that same order, so
+    # the report matches the serial run. A repo whose worker starts after the
+    # deadline comes back as None and is recorded as skipped, like the serial loop.
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [
+            pool.submit(scan_repo_before_deadline, repo_root, deadline, options, previous.get(str(repo_root)))
+            for repo_root in repo_dirs
+        ]
+        for repo_root, future in zip(repo_dirs, futures):
+            outcome = future.result()
+            if outcome is None:
+                yield skipped_repo_result(repo_root)
+                continue
+            yield remember(outcome)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_all(scan_root: Path, overall_timeout_sec: int = 300, jobs: int = 1, options: Optional[ScanOptions] = None, state: Optional[dict] = None) -> dict:
     result = {
         'scanned_root': str(scan_root),
         'repos': [],
-        'stats': {
-            'repos_scanned': 0,
-            'files_parsed': 0,
-            'agents_found': 0,
-            'tools_resolved': 0,
-            'errors': 0,
-        },
+        'stats': new_stats(),
     }
+    repo_timings: List[dict] = []
+    for repo_result in iter_repo_results(scan_root, overall_timeout_sec, jobs, options, state):
+        merge_repo_result(result, repo_result)
+        if repo_result.timings is not None:
+            repo_timings.append(repo_result.timings)
+    if options is not None and options.profile:
+        result['timings'] = merge_timings(repo_timings, options.slowest_files)
+    if options is not None and options.shard is not None:
+        result['shard'] = format_shard(options.shard)
+    return result
 
-    for child in sorted(scan_root.iterdir()):
-        if time.time() - start > overall_timeout_sec:
-            break
-        if not child.is_dir():
-            continue
-        repo_root = child
 
-        agents, warnings, files_parsed = parse_repo(repo_root)
+def write_ndjson(scan_root: Path, out: TextIO, overall_timeout_sec: int = 300, jobs: int = 1, options: Optional[ScanOptions] = None, state: Optional[dict] = None) -> dict:
+    """Stream one JSON line per repo as it is parsed, then a trailing scanned_root/stats line
+    (plus timings when profiling).
 
-        tools_resolved = sum(
-            sum(1 for t in a.get('tools_used', []) if t.get('defined_in') not in ('unknown', None))
-            for a in agents
-        )
+    Returns the accumulated stats.
+    """
+    totals = new_stats()
+    repo_timings: List[dict] = []
+    for repo_result in iter_repo_results(scan_root, overall_timeout_sec, jobs, options, state):
+        out.write(json.dumps(repo_result.entry, ensure_ascii=False, default=encode_record) + '\n')
+        out.flush()
+        add_stats(totals, repo_result.stats)
+        if repo_result.timings is not None:
+            repo_timings.append(repo_result.timings)
+    trailer = {'scanned_root': str(scan_root), 'stats': totals}
+    if options is not None and options.profile:
+        trailer['timings'] = merge_timings(repo_timings, options.slowest_files)
+    if options is not None and options.shard is not None:
+        trailer['shard'] = format_shard(options.shard)
+    out.write(json.dumps(trailer, ensure_ascii=False) + '\n')
+    out.flush()
+    return totals
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """argparse type for --shard i/N."""
+    index, sep, count = value.partition('/')
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not sep or not 1 <= shard[0] <= shard[1]:
+        raise argparse.ArgumentTypeError(f"expected i/N with 1 <= i <= N, got {value!r}")
+    return shard
 
-        result['repos'].append({
-            'repo_path': str(repo_root),
-            'agents': agents,
-            'warnings': [{'file': w.file, 'reason': w.reason} for w in warnings],
-        })
 
-        result['stats']['repos_scanned'] += 1
-        result['stats']['files_parsed'] += files_parsed
-        result['stats']['agents_found'] += len(agents)
-        result['stats']['tools_resolved'] += tools_resolved
-        result['stats']['errors'] += len([w for w in warnings if 'Error' in w.reason or 'SyntaxError' in w.reason])
+def format_shard(shard: Tuple[int, int]) -> str:
+    return f"{shard[0]}/{shard[1]}"
 
-    return result
 
+def load_state(path: Path) -> dict:
+    """Repo snapshots from a --since-state file; empty if missing or written by another version."""
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if doc.get('version') != CACHE_VERSION:
+        return {}
+    return doc.get('repos', {})
 
-def main(argv: List[str]) -> int:
-    parser = argparse.ArgumentParser(description='Parse CrewAI agents and tools from repos')
+
+def save_state(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'repos': state}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    """Flags that select and configure what is scanned; shared with serve_crewai_report.py."""
     parser.add_argument('--root', type=Path, default=DEFAULT_SCAN_ROOT, help='Root directory containing cloned repos (default: ./crewai-repos)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for parsing repos (default: 1)')
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_PATH, help=f'Parse cache file (default: ./{DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help='Parse cache size cap in MB; least recently used entries are evicted beyond it')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the persistent parse cache')
+    parser.add_argument('--file-budget', type=float, default=DEFAULT_FILE_BUDGET_SEC, help=f'Per-file agent extraction time budget in seconds; 0 disables (default: {DEFAULT_FILE_BUDGET_SEC:g})')
+    parser.add_argument('--repo-budget', type=float, default=0, help='Per-repo time budget in seconds; 0 disables (default: 0, only --timeout applies)')
+    parser.add_argument('--max-file-size', type=int, default=DEFAULT_MAX_FILE_BYTES, help=f'Skip .py files larger than this many bytes; 0 disables (default: {DEFAULT_MAX_FILE_BYTES})')
+    parser.add_argument('--llm-providers', type=Path, default=DEFAULT_PROVIDERS_PATH, help='JSON file of LLM providers: name, model keywords, LiteLLM prefixes and constructor classes (default: llm_providers.json next to this script)')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB', help="Skip files and directories whose repo-relative path (or base name, for a GLOB without '/') matches; repeatable")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB', help='Only parse .py files whose repo-relative path (or base name) matches one of these; repeatable')
+    parser.add_argument('--no-gitignore', action='store_true', help="Also parse files excluded by the repo's .gitignore")
+    parser.add_argument('--follow-symlinks', action='store_true', help='Walk into symlinked directories (each real directory once); uses the built-in walker instead of git ls-files')
+    parser.add_argument('--framework', action='append', default=None, help="Only scan the repos README.md lists under this framework section, e.g. CrewAI, LangGraph or 'all'; repeatable (default: every repo under --root)")
+    parser.add_argument('--readme', type=Path, default=Path('README.md'), help='README.md whose sections --framework selects from (default: ./README.md)')
+    parser.add_argument('--memory-ceiling-mb', type=int, default=0, help='Resident memory above which repos are indexed in two phases: only definition and import tables are kept, then the files that may construct agents are read and parsed again one at a time. Same results; adds peak_rss_mb and repos_two_phase to stats. 0 disables (default: 0)')
+    parser.add_argument('--extractor', action='append', default=None, help=f"Extract the agents of this framework: {', '.join(EXTRACTORS)} or 'all'; repeatable (default: {', '.join(DEFAULT_EXTRACTORS)}). Any other selection adds a framework key to each agent")
+
+
+def framework_repo_names(readme_path: Path, frameworks: List[str]) -> FrozenSet[str]:
+    """Directory names (as cloned by clone_crewai_repos.py) of the repos in the given README sections.
+
+    Raises ValueError for an unknown framework and OSError for an unreadable README.
+    """
+    index = load_section_index(readme_path)
+    names = set()
+    for url in select_repo_urls(index, select_sections(index, frameworks)):
+        try:
+            names.add(repo_dir_name(url))
+        except ValueError:
+            continue
+    return frozenset(names)
+
+
+def scan_options_from_args(args: argparse.Namespace) -> ScanOptions:
+    """ScanOptions for the scan flags; raises ValueError or OSError for a bad --framework/--readme/--extractor."""
+    extractors = tuple(args.extractor) if args.extractor else DEFAULT_EXTRACTORS
+    return ScanOptions(
+        cache_path=None if args.no_cache else args.cache.resolve(),
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        file_budget_sec=args.file_budget or None,
+        repo_budget_sec=args.repo_budget or None,
+        max_file_bytes=args.max_file_size or None,
+        llm_providers_path=args.llm_providers.resolve(),
+        walk=WalkOptions(
+            exclude=tuple(args.exclude),
+            include=tuple(args.include),
+            use_gitignore=not args.no_gitignore,
+            follow_symlinks=args.follow_symlinks,
+        ),
+        repo_names=framework_repo_names(args.readme, args.framework) if args.framework else None,
+        extractors=extractor_set(extractors).names,
+        memory_ceiling_bytes=args.memory_ceiling_mb * 1024 * 1024 or None,
+    )
+
+
+def merge_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='parse_crewai_repos.py merge', description='Merge the reports of --shard runs into the report of a single run')
+    parser.add_argument('reports', nargs='+', type=Path, help='Shard reports (JSON or NDJSON output of parse_crewai_repos.py)')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Format of the merged report (default: json)')
+    args = parser.parse_args(argv)
+    try:
+        warnings = merge_reports([ShardReport(path) for path in args.reports], sys.stdout, args.format)
+    except (OSError, ValueError) as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    for warning in warnings:
+        print(f"[warn] {warning}", file=sys.stderr)
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ['merge']:
+        return merge_main(argv[1:])
+    parser = argparse.ArgumentParser(description='Parse CrewAI agents and tools from repos; `parse_crewai_repos.py merge -h` for merging --shard reports')
+    add_scan_arguments(parser)
     parser.add_argument('--timeout', type=int, default=300, help='Overall timeout seconds (default: 300)')
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N', help='Only scan the i-th of N shards of the repos (1 <= i <= N), split by a stable hash of the repo directory name; combine the shard reports with the merge subcommand')
+    parser.add_argument('--since-state', type=Path, default=None, help='State file from a previous run; only .py files changed since each repo\'s recorded HEAD are re-parsed. Created/updated after the run.')
+    parser.add_argument('--profile', action='store_true', help='Add a timings section with per-phase and per-repo wall time and the slowest files')
+    parser.add_argument('--profile-slowest', type=int, default=DEFAULT_SLOWEST_FILES, help=f'Number of slowest files listed under timings (default: {DEFAULT_SLOWEST_FILES})')
+    parser.add_argument('--cprofile-out', type=Path, default=None, help='Write cProfile stats for this process to the given file (workers are not profiled with --jobs > 1)')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='json: one indented document at the end; ndjson: one line per repo as it is parsed, then a stats line')
     args = parser.parse_args(argv)
 
     scan_root = args.root.resolve()
     if not scan_root.exists():
-        print(json.dumps({
-            'scanned_root': str(scan_root),
-            'repos': [],
-            'stats': {
-                'repos_scanned': 0,
-                'files_parsed': 0,
-                'agents_found': 0,
-                'tools_resolved': 0,
-                'errors': 1,
-            },
-        }, ensure_ascii=False))
+        doc = {'scanned_root': str(scan_root), 'repos': [], 'stats': {**new_stats(), 'errors': 1}}
+        if args.format == 'ndjson':
+            del doc['repos']
+        print(json.dumps(doc, ensure_ascii=False))
         return 1
 
-    result = parse_all(scan_root, overall_timeout_sec=args.timeout)
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    try:
+        load_registry(args.llm_providers)
+        options = replace(
+            scan_options_from_args(args),
+            track_state=args.since_state is not None,
+            profile=args.profile,
+            slowest_files=args.profile_slowest,
+            shard=args.shard,
+        )
+    except (OSError, ValueError) as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    state = load_state(args.since_state) if args.since_state is not None else None
+
+    profiler = cProfile.Profile() if args.cprofile_out is not None else None
+    if profiler is not None:
+        if args.jobs > 1:
+            print('[warn] --cprofile-out only profiles the parent process; use --jobs 1 to profile parsing', file=sys.stderr)
+        profiler.enable()
+
+    if args.format == 'ndjson':
+        write_ndjson(scan_root, sys.stdout, overall_timeout_sec=args.timeout, jobs=args.jobs, options=options, state=state)
+    else:
+        result = parse_all(scan_root, overall_timeout_sec=args.timeout, jobs=args.jobs, options=options, state=state)
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=encode_record))
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(str(args.cprofile_out))
+
+    if state is not None:
+        save_state(args.since_state, state)
     return 0
 
 
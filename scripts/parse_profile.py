@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Phase timing for parse_crewai_repos.py --profile.
+
+A PhaseProfiler collects wall time and call counts per named phase while one
+repo is scanned, and attributes outermost phase time to the file being
+processed. Phases may nest (e.g. 'resolve_tools' runs inside
+'extract_agents'), so phase totals overlap; file totals only count the
+outermost phases and do not.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+DEFAULT_SLOWEST_FILES = 20
+
+
+class PhaseProfiler:
+    def __init__(self) -> None:
+        self.phases: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+        self.files: Dict[str, float] = {}
+        self.current_file: Optional[str] = None
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            totals = self.phases.setdefault(name, [0.0, 0])
+            totals[0] += elapsed
+            totals[1] += 1
+            if self._depth == 0 and self.current_file is not None:
+                self.files[self.current_file] = self.files.get(self.current_file, 0.0) + elapsed
+
+    def repo_timings(self, repo_path: str, seconds: float, slowest: int = DEFAULT_SLOWEST_FILES) -> dict:
+        return {
+            'repo_path': repo_path,
+            'seconds': seconds,
+            'phases': {name: {'seconds': t[0], 'calls': t[1]} for name, t in self.phases.items()},
+            'slowest_files': slowest_files(self.files.items(), slowest),
+        }
+
+
+def slowest_files(items, limit: int) -> List[dict]:
+    ranked = sorted(items, key=lambda kv: kv[1], reverse=True)[:limit]
+    return [{'file': f, 'seconds': s} for f, s in ranked]
+
+
+def merge_timings(repo_timings: List[dict], slowest: int = DEFAULT_SLOWEST_FILES) -> dict:
+    """Combine per-repo timings into the report's 'timings' section."""
+    phases: Dict[str, dict] = {}
+    files: List[tuple] = []
+    for rt in repo_timings:
+        for name, t in rt['phases'].items():
+            total = phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            total['seconds'] += t['seconds']
+            total['calls'] += t['calls']
+        files.extend((f['file'], f['seconds']) for f in rt['slowest_files'])
+    return {
+        'phases': phases,
+        'repos': sorted(
+            ({'repo_path': rt['repo_path'], 'seconds': rt['seconds']} for rt in repo_timings),
+            key=lambda r: r['seconds'],
+            reverse=True,
+        ),
+        'slowest_files': slowest_files(files, slowest),
+    }
+
+
+def merge_timing_sections(sections: List[dict], slowest: int = DEFAULT_SLOWEST_FILES) -> dict:
+    """Combine the 'timings' sections of several reports, e.g. the shards of one scan."""
+    phases: Dict[str, dict] = {}
+    repos: List[dict] = []
+    files: List[tuple] = []
+    for section in sections:
+        for name, t in section.get('phases', {}).items():
+            total = phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            total['seconds'] += t['seconds']
+            total['calls'] += t['calls']
+        repos.extend(section.get('repos', []))
+        files.extend((f['file'], f['seconds']) for f in section.get('slowest_files', []))
+    return {
+        'phases': phases,
+        'repos': sorted(repos, key=lambda r: r['seconds'], reverse=True),
+        'slowest_files': slowest_files(files, slowest),
+    }
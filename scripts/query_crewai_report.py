@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Indexed queries over parse_crewai_repos.py output.
+
+Loads a report (the JSON document or the --format ndjson stream) into an
+index keyed by tool name, tool qualname, where the tool is defined
+('repo' | 'external' | 'unknown'), LLM provider and repo, so questions such
+as "which repos use SerperDevTool" do not need a pass over the whole report.
+
+Two backends share one query API:
+  - MemoryIndex: dicts of row ids, built on every run
+  - SqliteIndex: the same rows in an indexed SQLite file (--db), built once
+    and reused by later queries
+
+Examples:
+  query_crewai_report.py --report crewai_report.json repos-using-tool SerperDevTool
+  query_crewai_report.py --report crewai_report.json --db index.sqlite agents-by-llm anthropic
+  query_crewai_report.py --db index.sqlite top-tools --source repo -n 10
+"""
+
+import argparse
+import itertools
+import json
+import sqlite3
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class AgentRow:
+    repo: str
+    name: str
+    role: Optional[str]
+    goal: Optional[str]
+    llm: Optional[str]
+    provider: Optional[str]
+
+
+@dataclass
+class ToolRow:
+    agent_id: int
+    repo: str
+    name: str
+    qualname: Optional[str]
+    kind: str
+    defined_in: str
+    source: str  # 'repo' | 'external' | 'unknown'
+
+
+def llm_provider(llm: Optional[str]) -> Optional[str]:
+    """'openai:gpt-4' -> 'openai'; 'unknown' stays 'unknown'; None stays None."""
+    if llm is None:
+        return None
+    return llm.split(':', 1)[0]
+
+
+def tool_source(defined_in: Optional[str]) -> str:
+    if defined_in in ('external', 'unknown'):
+        return defined_in
+    return 'repo' if defined_in else 'unknown'
+
+
+def iter_report_repos(path: Path) -> Iterator[dict]:
+    """Yield each repo entry of a report, streaming NDJSON line by line.
+
+    Raises ValueError for an empty or truncated report, e.g. one still being written.
+    """
+    with path.open('r', encoding='utf-8') as f:
+        first = f.readline()
+        try:
+            doc = json.loads(first)
+        except ValueError:
+            doc = None
+        if doc is None or 'repos' in doc:
+            # A single (possibly indented) JSON document
+            f.seek(0)
+            try:
+                doc = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{path}: not a complete JSON report ({e})") from None
+            yield from doc.get('repos', [])
+            return
+        for lineno, line in enumerate(itertools.chain([first], f), 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{lineno}: incomplete NDJSON line ({e})") from None
+            if 'repo_path' in entry:
+                yield entry
+
+
+def iter_rows(repos: Iterator[dict]) -> Iterator[Tuple[AgentRow, List[ToolRow]]]:
+    agent_id = 0
+    for entry in repos:
+        repo = entry['repo_path']
+        for agent in entry.get('agents', []):
+            row = AgentRow(
+                repo=repo,
+                name=agent.get('name'),
+                role=agent.get('role'),
+                goal=agent.get('goal'),
+                llm=agent.get('llm'),
+                provider=llm_provider(agent.get('llm')),
+            )
+            tools = [
+                ToolRow(
+                    agent_id=agent_id,
+                    repo=repo,
+                    name=t.get('name'),
+                    qualname=t.get('qualname'),
+                    kind=t.get('kind'),
+                    defined_in=t.get('defined_in'),
+                    source=tool_source(t.get('defined_in')),
+                )
+                for t in agent.get('tools_used', [])
+            ]
+            yield row, tools
+            agent_id += 1
+
+
+class MemoryIndex:
+    def __init__(self) -> None:
+        self.agents: List[AgentRow] = []
+        self.tools: List[ToolRow] = []
+        self._tools_by_name: Dict[str, List[int]] = {}
+        self._tools_by_qualname: Dict[str, List[int]] = {}
+        self._tools_by_source: Dict[str, List[int]] = {}
+        self._agents_by_provider: Dict[Optional[str], List[int]] = {}
+        self._agents_by_repo: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_report(cls, path: Path) -> 'MemoryIndex':
+        index = cls()
+        for agent, tools in iter_rows(iter_report_repos(path)):
+            index.add(agent, tools)
+        return index
+
+    def add(self, agent: AgentRow, tools: List[ToolRow]) -> None:
+        self._agents_by_provider.setdefault(agent.provider, []).append(len(self.agents))
+        self._agents_by_repo.setdefault(agent.repo, []).append(len(self.agents))
+        self.agents.append(agent)
+        for tool in tools:
+            i = len(self.tools)
+            self._tools_by_name.setdefault(tool.name, []).append(i)
+            if tool.qualname:
+                self._tools_by_qualname.setdefault(tool.qualname, []).append(i)
+            self._tools_by_source.setdefault(tool.source, []).append(i)
+            self.tools.append(tool)
+
+    def repos_using_tool(self, name: str) -> List[str]:
+        ids = self._tools_by_name.get(name, []) + self._tools_by_qualname.get(name, [])
+        return sorted({self.tools[i].repo for i in ids})
+
+    def agents_by_provider(self, provider: str) -> List[AgentRow]:
+        return [self.agents[i] for i in self._agents_by_provider.get(provider, [])]
+
+    def agents_in_repo(self, repo: str) -> List[AgentRow]:
+        return [self.agents[i] for i in self._agents_by_repo.get(repo, [])]
+
+    def top_tools(self, limit: int = 10, source: Optional[str] = None) -> List[Tuple[str, int]]:
+        ids = self._tools_by_source.get(source, []) if source else range(len(self.tools))
+        counts = Counter(self.tools[i].name for i in ids)
+        return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+
+
+class SqliteIndex:
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS agents ('
+        ' id INTEGER PRIMARY KEY, repo TEXT, name TEXT, role TEXT, goal TEXT, llm TEXT, provider TEXT)',
+        'CREATE TABLE IF NOT EXISTS tools ('
+        ' agent_id INTEGER, repo TEXT, name TEXT, qualname TEXT, kind TEXT, defined_in TEXT, source TEXT)',
+        'CREATE INDEX IF NOT EXISTS agents_provider ON agents (provider)',
+        'CREATE INDEX IF NOT EXISTS agents_llm ON agents (llm)',
+        'CREATE INDEX IF NOT EXISTS agents_repo ON agents (repo)',
+        'CREATE INDEX IF NOT EXISTS tools_name ON tools (name)',
+        'CREATE INDEX IF NOT EXISTS tools_qualname ON tools (qualname)',
+        'CREATE INDEX IF NOT EXISTS tools_source ON tools (source, name)',
+        'CREATE INDEX IF NOT EXISTS tools_repo ON tools (repo)',
+    ]
+
+    def __init__(self, path: Path) -> None:
+        self._conn = sqlite3.connect(str(path))
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+
+    @classmethod
+    def from_report(cls, report: Path, path: Path) -> 'SqliteIndex':
+        """(Re)build the database at path from a report."""
+        index = cls(path)
+        with index._conn:
+            index._conn.execute('DELETE FROM agents')
+            index._conn.execute('DELETE FROM tools')
+            for agent, tools in iter_rows(iter_report_repos(report)):
+                cur = index._conn.execute(
+                    'INSERT INTO agents (repo, name, role, goal, llm, provider) VALUES (?, ?, ?, ?, ?, ?)',
+                    (agent.repo, agent.name, agent.role, agent.goal, agent.llm, agent.provider),
+                )
+                index._conn.executemany(
+                    'INSERT INTO tools (agent_id, repo, name, qualname, kind, defined_in, source) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(cur.lastrowid, t.repo, t.name, t.qualname, t.kind, t.defined_in, t.source) for t in tools],
+                )
+        return index
+
+    def _agents(self, where: str, arg: str) -> List[AgentRow]:
+        rows = self._conn.execute(
+            f'SELECT repo, name, role, goal, llm, provider FROM agents WHERE {where} = ? ORDER BY id', (arg,),
+        )
+        return [AgentRow(*row) for row in rows]
+
+    def repos_using_tool(self, name: str) -> List[str]:
+        rows = self._conn.execute(
+            'SELECT repo FROM tools WHERE name = ? UNION SELECT repo FROM tools WHERE qualname = ? ORDER BY repo',
+            (name, name),
+        )
+        return [row[0] for row in rows]
+
+    def agents_by_provider(self, provider: str) -> List[AgentRow]:
+        return self._agents('provider', provider)
+
+    def agents_in_repo(self, repo: str) -> List[AgentRow]:
+        return self._agents('repo', repo)
+
+    def top_tools(self, limit: int = 10, source: Optional[str] = None) -> List[Tuple[str, int]]:
+        if source:
+            rows = self._conn.execute(
+                'SELECT name, COUNT(*) AS n FROM tools WHERE source = ? GROUP BY name ORDER BY n DESC, name LIMIT ?',
+                (source, limit),
+            )
+        else:
+            rows = self._conn.execute(
+                'SELECT name, COUNT(*) AS n FROM tools GROUP BY name ORDER BY n DESC, name LIMIT ?', (limit,),
+            )
+        return [(name, n) for name, n in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def format_agent(agent: AgentRow) -> str:
+    return f"{agent.repo}\t{agent.name}\t{agent.llm}\t{agent.role}"
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Query agents and tools across a parse_crewai_repos.py report')
+    parser.add_argument('--report', type=Path, default=None, help='Report to index (JSON or NDJSON output of parse_crewai_repos.py)')
+    parser.add_argument('--db', type=Path, default=None, help='SQLite index file; rebuilt from --report if given, otherwise reused')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('repos-using-tool', help='Repos whose agents use a tool (by name or qualname)')
+    p.add_argument('tool')
+    p = sub.add_parser('agents-by-llm', help="Agents whose LLM label has the given provider (e.g. openai, anthropic, unknown)")
+    p.add_argument('provider')
+    p = sub.add_parser('agents-in-repo', help='Agents found in one repo')
+    p.add_argument('repo')
+    p = sub.add_parser('top-tools', help='Most used tool names')
+    p.add_argument('-n', type=int, default=10, help='Number of tools to list (default: 10)')
+    p.add_argument('--source', choices=['repo', 'external', 'unknown'], default=None, help='Only tools from this source')
+    args = parser.parse_args(argv)
+
+    if args.report is None and args.db is None:
+        parser.error('--report or --db is required')
+    if args.report is not None and not args.report.exists():
+        print(f"Report not found: {args.report}", file=sys.stderr)
+        return 1
+    if args.report is None and not args.db.exists():
+        print(f"Index not found: {args.db}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.db is not None:
+            index = SqliteIndex.from_report(args.report, args.db) if args.report is not None else SqliteIndex(args.db)
+        else:
+            index = MemoryIndex.from_report(args.report)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+
+    if args.command == 'repos-using-tool':
+        for repo in index.repos_using_tool(args.tool):
+            print(repo)
+    elif args.command == 'agents-by-llm':
+        for agent in index.agents_by_provider(args.provider):
+            print(format_agent(agent))
+    elif args.command == 'agents-in-repo':
+        for agent in index.agents_in_repo(args.repo):
+            print(format_agent(agent))
+    elif args.command == 'top-tools':
+        for name, count in index.top_tools(args.n, args.source):
+            print(f"{count}\t{name}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Index of the framework sections of the awesome-list README.md.
+
+README.md lists repos under one heading per framework:
+
+  ### <a name="CrewAI"></a>CrewAI
+  - [owner/repo](https://github.com/owner/repo) - description
+
+build_section_index reads the README in one pass. It maps every anchored
+section to the GitHub URLs of its list items, in order and without
+duplicates. A section ends at the next heading. load_section_index keeps
+the index per README path, mtime and size, so every lookup in a process
+after the first is a dict access.
+
+select_repo_urls picks any number of sections with --framework names.
+Names are matched ignoring case, spaces and punctuation ('pydantic-ai'
+selects "Pydantic AI"), and 'all' selects every section. A URL listed in
+several selected sections is kept once.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+
+SECTION_RE = re.compile(r'#+\s*<a name="([^"]*)"></a>')
+GITHUB_LINK_RE = re.compile(r"\((https?://github\.com/[^)]+)\)")
+
+DEFAULT_FRAMEWORKS = ('CrewAI',)
+ALL_FRAMEWORKS = 'all'
+
+
+def build_section_index(readme_text: str) -> Dict[str, List[str]]:
+    """Section anchor name -> GitHub URLs of the section's list items."""
+    index: Dict[str, List[str]] = {}
+    current = None
+    for line in readme_text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('#'):
+            m = SECTION_RE.match(stripped)
+            current = index.setdefault(m.group(1), []) if m else None
+        elif current is not None and stripped.startswith('-'):
+            # First markdown link URL in the line
+            m = GITHUB_LINK_RE.search(stripped)
+            if m:
+                current.append(m.group(1).strip())
+    return {name: list(dict.fromkeys(urls)) for name, urls in index.items()}
+
+
+def load_section_index(readme_path: Path) -> Dict[str, List[str]]:
+    """build_section_index of a README file, reused while its mtime and size are unchanged.
+
+    The index is shared between callers and must not be modified.
+    """
+    st = readme_path.stat()
+    return _section_index(str(readme_path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _section_index(path: str, mtime_ns: int, size: int) -> Dict[str, List[str]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_section_index(f.read())
+
+
+def framework_key(name: str) -> str:
+    return re.sub(r'[\W_]+', '', name).lower()
+
+
+def select_sections(index: Dict[str, List[str]], frameworks: Iterable[str]) -> List[str]:
+    """Section names selected by --framework values, in the order given.
+
+    Raises ValueError for a name that matches no section.
+    """
+    by_key = {framework_key(name): name for name in index}
+    selected: List[str] = []
+    for framework in frameworks:
+        if framework.lower() == ALL_FRAMEWORKS:
+            names = list(index)
+        elif framework_key(framework) in by_key:
+            names = [by_key[framework_key(framework)]]
+        else:
+            raise ValueError(f"no README section for framework {framework!r}; sections: {', '.join(index)}")
+        selected.extend(n for n in names if n not in selected)
+    return selected
+
+
+def select_repo_urls(index: Dict[str, List[str]], sections: Iterable[str]) -> List[str]:
+    """URLs of the given sections, each once."""
+    return list(dict.fromkeys(url for name in sections for url in index[name]))
+
+
+def owner_repo_from_url(url: str) -> Tuple[str, str]:
+    # e.g., https://github.com/owner/repo or with trailing parts
+    m = re.match(r"https?://github\.com/([^/]+)/([^/#?]+)", url)
+    if not m:
+        # Local mirrors, e.g. file:///srv/mirrors/owner/repo.git
+        m = re.match(r"file://(?:[^/]*)/(?:.*/)?([^/]+)/([^/]+?)(?:\.git)?/?$", url)
+    if not m:
+        raise ValueError(f'Unrecognized GitHub URL: {url}')
+    return m.group(1), m.group(2)
+
+
+def repo_dir_name(url: str) -> str:
+    """Directory clone_crewai_repos.py clones url into, under --dest."""
+    owner, repo = owner_repo_from_url(url)
+    return f"{owner}-{repo}"
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Python file discovery for parse_crewai_repos.py.
+
+iter_repo_files yields a repo's .py files as they are found, so parsing can
+start before the walk is done:
+
+  - In a git work tree it streams `git ls-files --cached --others
+    --exclude-standard`, which applies every .gitignore, .git/info/exclude
+    and the user's global excludes.
+  - Otherwise (no .git, git missing or failing, --follow-symlinks) it walks
+    the tree depth first with os.scandir, in the same path order as git,
+    pruning directories ignored by the repo's own .gitignore files.
+
+Either way, directories named in IGNORED_DIR_NAMES or matching an --exclude
+glob are skipped, and with --include globs only matching files are kept.
+Globs are fnmatch patterns on the repo-relative POSIX path; a glob without a
+'/' is matched against the base name. Symlinked directories are only
+entered with follow_symlinks, and each real directory is walked at most
+once, so symlink loops end.
+"""
+
+import fnmatch
+import os
+import re
+import select
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Pattern, Set, Tuple
+
+
+IGNORED_DIR_NAMES = {
+    '.git', '__pycache__', 'node_modules', 'venv', '.venv', 'build', 'dist', '.mypy_cache', '.pytest_cache',
+    '.tox', '.nox', '.eggs', 'site-packages', '.ipynb_checkpoints', '.ruff_cache',
+}
+
+GIT_LS_FILES_TIMEOUT_SEC = 60
+
+
+@dataclass(frozen=True)
+class WalkOptions:
+    exclude: Tuple[str, ...] = ()
+    include: Tuple[str, ...] = ()
+    use_gitignore: bool = True  # .gitignore / git ls-files (--no-gitignore disables)
+    follow_symlinks: bool = False
+
+
+class GlobSet:
+    """fnmatch globs compiled into one regex per kind (full path / base name)."""
+
+    def __init__(self, globs: Tuple[str, ...]) -> None:
+        self.empty = not globs
+        self._path = self._compile([g.strip('/') for g in globs if '/' in g.strip('/')])
+        self._name = self._compile([g.strip('/') for g in globs if '/' not in g.strip('/')])
+
+    @staticmethod
+    def _compile(globs: List[str]) -> Optional[Pattern[str]]:
+        return re.compile('|'.join(fnmatch.translate(g) for g in globs)) if globs else None
+
+    def matches(self, rel: str) -> bool:
+        if self._path is not None and self._path.match(rel):
+            return True
+        return self._name is not None and self._name.match(rel.rsplit('/', 1)[-1]) is not None
+
+
+def gitignore_rule(line: str) -> Optional[Tuple[Pattern[str], bool, bool]]:
+    """(regex on the path relative to the .gitignore's directory, negated, dirs only) for one line."""
+    line = line.rstrip('\n').rstrip()
+    if not line or line.startswith('#'):
+        return None
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    if line.startswith('\\'):
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    anchored = '/' in line
+    line = line.lstrip('/')
+    out: List[str] = []
+    i = 0
+    while i < len(line):
+        if line.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif line.startswith('/**', i) and i + 3 == len(line):
+            out.append('/.*')
+            i += 3
+        elif line.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif line[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif line[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif line[i] == '[' and ']' in line[i + 2:]:
+            end = line.index(']', i + 2)
+            body = line[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end + 1
+        else:
+            out.append(re.escape(line[i]))
+            i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(prefix + ''.join(out) + '$'), negated, dir_only
+
+
+class GitignoreRules:
+    """Rules of the .gitignore files from the repo root down to one directory."""
+
+    def __init__(self, rules: Tuple[Tuple[str, Pattern[str], bool, bool], ...] = ()) -> None:
+        self.rules = rules  # (base dir relative to the repo, regex, negated, dir only)
+
+    def extended(self, directory: Path, rel_dir: str) -> 'GitignoreRules':
+        try:
+            with (directory / '.gitignore').open('r', encoding='utf-8', errors='replace') as f:
+                lines = f.readlines()
+        except OSError:
+            return self
+        base = f"{rel_dir}/" if rel_dir else ''
+        added = tuple((base, *rule) for rule in map(gitignore_rule, lines) if rule is not None)
+        return GitignoreRules(self.rules + added) if added else self
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if not rel.startswith(base):
+                continue
+            if regex.match(rel[len(base):]):
+                ignored = not negated
+        return ignored
+
+
+def is_python_file(name: str) -> bool:
+    return name.endswith('.py') and not name.startswith('.')  # skip dotfiles
+
+
+def iter_repo_files(root: Path, options: Optional[WalkOptions] = None) -> Iterator[Path]:
+    """Yield the .py files of a repo under root as they are discovered."""
+    options = options or WalkOptions()
+    exclude = GlobSet(options.exclude)
+    include = GlobSet(options.include)
+    files = None
+    if options.use_gitignore and not options.follow_symlinks and (root / '.git').exists():
+        files = git_ls_files(root)
+    from_git = files is not None
+    if files is None:
+        files = scandir_files(root, options.use_gitignore, options.follow_symlinks, exclude)
+    for rel in files:
+        parts = rel.split('/')
+        if any(p in IGNORED_DIR_NAMES for p in parts[:-1]) or not is_python_file(parts[-1]):
+            continue
+        if not exclude.empty and any(exclude.matches('/'.join(parts[:i])) for i in range(1, len(parts) + 1)):
+            continue
+        if not include.empty and not include.matches(rel):
+            continue
+        path = root / rel
+        # git also lists files absent from the work tree (deleted, or outside
+        # a sparse checkout); checked last as it costs a stat
+        if from_git and not path.is_file():
+            continue
+        yield path
+
+
+def git_ls_files(root: Path) -> Optional[Iterator[str]]:
+    """Repo-relative paths from git ls-files, streamed; None if git cannot list the tree."""
+    try:
+        proc = subprocess.Popen(
+            ['git', '-C', str(root), 'ls-files', '-z', '--cached', '--others', '--exclude-standard', '--', '*.py'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    # Wait for the first chunk so a failing git (not a work tree, dubious
+    # ownership, ...) or one that hangs falls back to the walker instead of
+    # yielding nothing or blocking the scan.
+    if not _readable_within(proc.stdout, GIT_LS_FILES_TIMEOUT_SEC):
+        _stop(proc)
+        return None
+    first = proc.stdout.read1(65536)
+    if not first:
+        try:
+            returncode = proc.wait(timeout=GIT_LS_FILES_TIMEOUT_SEC)
+        except subprocess.TimeoutExpired:
+            returncode = None
+        if returncode != 0:
+            _stop(proc)
+            return None
+    return _stream_ls_files(proc, first)
+
+
+def _readable_within(stream, timeout: float) -> bool:
+    try:
+        ready, _, _ = select.select([stream], [], [], timeout)
+    except (OSError, ValueError):
+        return True  # not selectable (pipes on Windows): just read
+    return bool(ready)
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    proc.stdout.close()
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+
+
+def _stream_ls_files(proc: subprocess.Popen, buffered: bytes) -> Iterator[str]:
+    seen: Set[str] = set()
+    try:
+        while True:
+            *paths, buffered = buffered.split(b'\0')
+            for raw in paths:
+                rel = os.fsdecode(raw)
+                # unmerged files are listed once per stage
+                if rel not in seen:
+                    seen.add(rel)
+                    yield rel
+            chunk = proc.stdout.read1(65536)
+            if not chunk:
+                break
+            buffered += chunk
+    finally:
+        _stop(proc)
+
+
+def scandir_files(root: Path, use_gitignore: bool, follow_symlinks: bool, exclude: Optional[GlobSet] = None) -> Iterator[str]:
+    """Repo-relative file paths, depth first in git's path order, pruning ignored directories."""
+    visited: Set[Tuple[int, int]] = set()
+    try:
+        st = root.stat()
+        visited.add((st.st_dev, st.st_ino))
+    except OSError:
+        return
+    rules = GitignoreRules().extended(root, '') if use_gitignore else GitignoreRules()
+    stack = [iter(sorted_entries(root))]
+    dirs = [('', rules)]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            dirs.pop()
+            continue
+        rel_dir, rules = dirs[-1]
+        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+        except OSError:
+            continue
+        if is_dir:
+            if entry.name in IGNORED_DIR_NAMES or rules.ignored(rel, True):
+                continue
+            if exclude is not None and not exclude.empty and exclude.matches(rel):
+                continue
+            try:
+                st = entry.stat(follow_symlinks=True)
+            except OSError:
+                continue
+            key = (st.st_dev, st.st_ino)
+            if key in visited:
+                continue
+            visited.add(key)
+            path = Path(entry.path)
+            stack.append(iter(sorted_entries(path)))
+            dirs.append((rel, rules.extended(path, rel) if use_gitignore else rules))
+        elif is_python_file(entry.name) and not rules.ignored(rel, False):
+            yield rel
+
+
+def sorted_entries(directory: Path) -> List[os.DirEntry]:
+    """Entries of a directory in git's order: by name, directories as if named 'name/'."""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return []
+
+    def key(entry: os.DirEntry) -> str:
+        try:
+            # git records a symlink as a file, whatever it points to
+            return entry.name + '/' if entry.is_dir(follow_symlinks=False) else entry.name
+        except OSError:
+            return entry.name
+    return sorted(entries, key=key)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Merging of parse_crewai_repos.py --shard reports (`parse_crewai_repos.py merge`).
+
+Each shard report, as a JSON document or an NDJSON stream, lists its repos in
+the same sorted order as a single-node scan. The shard reports are therefore
+merged with one streaming k-way merge on the repo directory name, and the
+result has the same repo order as a run over the whole root. NDJSON inputs
+and output are never held in memory whole. stats are summed key by key
+(peaks, such as peak_rss_mb, take the maximum) and timings sections combined. A repo listed by two reports is an error.
+Reports of different roots, or a set of shards that is not exactly
+1/N..N/N, are merged with a warning.
+"""
+
+import heapq
+import itertools
+import json
+from pathlib import PurePath
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from parse_profile import merge_timing_sections
+
+
+# stats that are the maximum of their parts rather than the sum
+PEAK_STATS = frozenset({'peak_rss_mb'})
+
+
+def add_stats(totals: Dict[str, int], stats: Dict[str, int]) -> None:
+    """Add one repo's or report's stats into totals."""
+    for name, value in stats.items():
+        if name in PEAK_STATS:
+            totals[name] = max(totals.get(name, 0), value)
+        else:
+            totals[name] = totals.get(name, 0) + value
+
+
+def repo_sort_key(entry: dict) -> str:
+    # A scan sorts the repo directories of one root, i.e. by name.
+    return PurePath(entry['repo_path']).name
+
+
+class ShardReport:
+    """One report to merge. scanned_root, stats, shard and timings are set
+    while repos() is consumed (for NDJSON, once its last line is read)."""
+
+    def __init__(self, path: PurePath) -> None:
+        self.path = path
+        self.scanned_root: Optional[str] = None
+        self.stats: Dict[str, int] = {}
+        self.shard: Optional[str] = None
+        self.timings: Optional[dict] = None
+
+    def _read_trailer(self, doc: dict) -> None:
+        self.scanned_root = doc.get('scanned_root')
+        self.stats = doc.get('stats', {})
+        self.shard = doc.get('shard')
+        self.timings = doc.get('timings')
+
+    def repos(self) -> Iterator[dict]:
+        """The report's repo entries, checked to be in scan order."""
+        last = None
+        for entry in self._entries():
+            key = repo_sort_key(entry)
+            if last is not None and key <= last:
+                raise ValueError(f'{self.path}: repos are not in scan order ({entry["repo_path"]} after {last})')
+            last = key
+            yield entry
+
+    def _entries(self) -> Iterator[dict]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            first = f.readline()
+            try:
+                doc = json.loads(first)
+            except ValueError:
+                doc = None
+            if not isinstance(doc, dict) or 'repos' in doc:
+                # A single (possibly indented) JSON document
+                f.seek(0)
+                doc = json.load(f)
+                self._read_trailer(doc)
+                yield from doc.get('repos', [])
+                return
+            for line in itertools.chain([first], f):
+                if not line.strip():
+                    continue
+                doc = json.loads(line)
+                if 'repo_path' in doc:
+                    yield doc
+                elif 'stats' in doc:
+                    self._read_trailer(doc)
+
+
+def shard_warnings(reports: List[ShardReport]) -> List[str]:
+    warnings: List[str] = []
+    roots = sorted({r.scanned_root for r in reports if r.scanned_root is not None})
+    if len(roots) > 1:
+        warnings.append(f"reports scanned different roots: {', '.join(roots)}")
+    shards = [r.shard for r in reports if r.shard is not None]
+    if shards:
+        counts = {s.split('/', 1)[1] for s in shards}
+        expected = {f'{i}/{n}' for n in counts for i in range(1, int(n) + 1)}
+        if len(counts) > 1 or len(shards) != len(reports) or sorted(shards) != sorted(expected):
+            warnings.append(f"shards {', '.join(s or '-' for s in (r.shard for r in reports))} are not one complete set")
+    return warnings
+
+
+def merge_reports(reports: List[ShardReport], out: TextIO, fmt: str = 'json') -> List[str]:
+    """Write the merged report to out in fmt ('json' or 'ndjson'); returns warnings.
+
+    Raises ValueError for a malformed report or a repo listed twice.
+    """
+    merged = heapq.merge(*(r.repos() for r in reports), key=repo_sort_key)
+    repos: List[dict] = []
+    last = None
+    for entry in merged:
+        key = repo_sort_key(entry)
+        if key == last:
+            raise ValueError(f"repo {key} is listed by more than one report")
+        last = key
+        if fmt == 'ndjson':
+            out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        else:
+            repos.append(entry)
+
+    stats: Dict[str, int] = {}
+    for report in reports:
+        add_stats(stats, report.stats)
+    doc: dict = {'scanned_root': next((r.scanned_root for r in reports if r.scanned_root), None)}
+    if fmt != 'ndjson':
+        doc['repos'] = repos
+    doc['stats'] = stats
+    sections = [r.timings for r in reports if r.timings is not None]
+    if sections:
+        doc['timings'] = merge_timing_sections(sections)
+    if fmt == 'ndjson':
+        out.write(json.dumps(doc, ensure_ascii=False) + '\n')
+    else:
+        out.write(json.dumps(doc, ensure_ascii=False, indent=2) + '\n')
+    out.flush()
+    return shard_warnings(reports)
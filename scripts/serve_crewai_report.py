@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Long-running parse_crewai_repos.py that keeps every repo's scan in memory and
+serves the current report locally.
+
+The first scan is a normal parse_crewai_repos.py run (same scan flags, same
+parse cache). After that, every --interval seconds each repo is walked again
+and the mtime and size of its .py files, and of the agent configs (@CrewBase
+agents.yaml) its last scan read, compared with the previous walk.
+Only repos with a change are rescanned, and within them only new or touched
+files are read and parsed. The other files keep their in-memory record
+(definitions, import bindings and, unless the repo's symbol index changed,
+agents), as with --since-state. Repos added to or removed from the root are
+picked up the same way. Changes are found by polling; nothing outside the
+standard library is needed.
+
+The report is encoded once per change, so requests are answered from memory:
+
+  GET /report   the parse_crewai_repos.py JSON document
+  GET /stats    {'scanned_root', 'stats', 'generation', 'updated_at'}
+
+Both answer 503 until the first scan has finished.
+
+Examples:
+  serve_crewai_report.py --root crewai-repos --listen 127.0.0.1:8765
+  serve_crewai_report.py --root crewai-repos --listen unix:/tmp/crewai-report.sock
+  curl --unix-socket /tmp/crewai-report.sock http://localhost/stats
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from llm_providers import load_registry
+from parse_crewai_repos import (
+    RepoResult, ScanOptions, add_scan_arguments, encode_record, iter_repo_dirs, iter_repo_results,
+    merge_repo_result, new_stats, scan_options_from_args, scan_repo,
+)
+from repo_files import WalkOptions, iter_repo_files
+
+
+DEFAULT_LISTEN = '127.0.0.1:8765'
+DEFAULT_POLL_INTERVAL_SEC = 2.0
+
+# The first scan runs to completion, however long it takes.
+NO_TIMEOUT_SEC = 10 ** 9
+
+FileStamps = Dict[str, Tuple[int, int]]  # repo-relative path -> (mtime_ns, size)
+
+
+def file_stamps(repo_root: Path, walk: WalkOptions) -> FileStamps:
+    """Stamps of the .py files a scan of repo_root would see."""
+    stamps: FileStamps = {}
+    prefix = len(str(repo_root)) + 1
+    for path in iter_repo_files(repo_root, walk):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stamps[str(path)[prefix:].replace(os.sep, '/')] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def config_stamps(snapshot: Optional[dict]) -> FileStamps:
+    """Stamps of the agent configs read by a scan, keyed by absolute path; (0, 0) for a missing one."""
+    stamps: FileStamps = {}
+    for record in (snapshot or {}).get('files', {}).values():
+        for path in record.get('agent_configs', ()):
+            try:
+                st = os.stat(path)
+                stamps[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamps[path] = (0, 0)
+    return stamps
+
+
+class ReportWatcher:
+    """Scan results of every repo under a root, kept current by rescan()."""
+
+    def __init__(self, scan_root: Path, options: ScanOptions, jobs: int = 1) -> None:
+        self.scan_root = scan_root
+        # Snapshots are what lets a rescan reuse the records of untouched files.
+        self.options = replace(options, track_state=True, profile=False)
+        self.jobs = jobs
+        self.results: Dict[str, RepoResult] = {}
+        self.state: Dict[str, dict] = {}  # repo_path -> snapshot of its last scan
+        self.stamps: Dict[str, FileStamps] = {}  # repo_path -> stamps seen before its last scan
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._documents: Dict[str, bytes] = {}
+
+    def scan_all(self) -> None:
+        for repo_root in iter_repo_dirs(self.scan_root, self.options.shard, self.options.repo_names):
+            self.stamps[str(repo_root)] = file_stamps(repo_root, self.options.walk)
+        for repo_result in iter_repo_results(self.scan_root, NO_TIMEOUT_SEC, self.jobs, self.options, self.state):
+            repo_path = repo_result.entry['repo_path']
+            self.results[repo_path] = repo_result
+            self.stamps[repo_path].update(config_stamps(self.state.get(repo_path)))
+        self.publish()
+
+    def rescan(self) -> List[str]:
+        """Rescan the repos whose files changed since their last scan and drop removed ones; returns their paths."""
+        repo_dirs = {str(p): p for p in iter_repo_dirs(self.scan_root, self.options.shard, self.options.repo_names)}
+        changed = [repo_path for repo_path in self.results if repo_path not in repo_dirs]
+        for repo_path in changed:
+            del self.results[repo_path]
+            self.state.pop(repo_path, None)
+            self.stamps.pop(repo_path, None)
+        for repo_path, repo_root in repo_dirs.items():
+            stamps = file_stamps(repo_root, self.options.walk)
+            stamps.update(config_stamps(self.state.get(repo_path)))
+            previous = self.stamps.get(repo_path)
+            if previous == stamps and repo_path in self.results:
+                continue
+            # Stamps are taken before the scan reads the files, so a file
+            # written during the scan shows up as changed on the next poll.
+            unchanged = {rel for rel, stamp in stamps.items() if previous is not None and previous.get(rel) == stamp}
+            repo_result = scan_repo(repo_root, self.options, self.state.get(repo_path), unchanged=unchanged)
+            self.results[repo_path] = repo_result
+            if repo_result.snapshot is not None:
+                self.state[repo_path] = repo_result.snapshot
+            self.stamps[repo_path] = stamps
+            changed.append(repo_path)
+        if changed:
+            self.publish()
+        return changed
+
+    def publish(self) -> None:
+        """Encode the report served from now on."""
+        result = {'scanned_root': str(self.scan_root), 'repos': [], 'stats': new_stats()}
+        for repo_path in sorted(self.results):
+            merge_repo_result(result, self.results[repo_path])
+        generation = self.generation + 1
+        stats = {
+            'scanned_root': result['scanned_root'],
+            'stats': result['stats'],
+            'generation': generation,
+            'updated_at': time.time(),
+        }
+        documents = {
+            '/report': json.dumps(result, ensure_ascii=False, default=encode_record).encode('utf-8'),
+            '/stats': json.dumps(stats, ensure_ascii=False).encode('utf-8'),
+        }
+        with self._lock:
+            self.generation = generation
+            self._documents = documents
+
+    def document(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            return self._documents.get(path)
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        path = self.path.split('?', 1)[0].rstrip('/') or '/report'
+        if path not in ('/report', '/stats'):
+            self.send_error(404)
+            return
+        body = self.server.watcher.document(path)
+        if body is None:
+            self.send_error(503, 'Initial scan in progress')
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass  # also: client_address is not a (host, port) pair on a Unix socket
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(listen: str, watcher: ReportWatcher) -> socketserver.BaseServer:
+    """HTTP server on HOST:PORT, or on a Unix socket for 'unix:PATH'."""
+    if listen.startswith('unix:'):
+        path = listen[len('unix:'):]
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)  # left behind by an earlier run
+        except FileNotFoundError:
+            pass
+        server: socketserver.BaseServer = ThreadingUnixHTTPServer(path, ReportRequestHandler)
+    else:
+        host, _, port = listen.rpartition(':')
+        server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), ReportRequestHandler)
+    server.watcher = watcher  # type: ignore[attr-defined]
+    return server
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Serve a parse_crewai_repos.py report, rescanning repos as their files change')
+    add_scan_arguments(parser)
+    parser.add_argument('--listen', default=DEFAULT_LISTEN, help=f'HOST:PORT, or unix:PATH for a Unix socket (default: {DEFAULT_LISTEN})')
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL_SEC, help=f'Seconds between polls for changed files (default: {DEFAULT_POLL_INTERVAL_SEC:g})')
+    args = parser.parse_args(argv)
+
+    scan_root = args.root.resolve()
+    if not scan_root.is_dir():
+        print(f"[error] scan root not found: {scan_root}", file=sys.stderr)
+        return 1
+    try:
+        load_registry(args.llm_providers)
+        options = scan_options_from_args(args)
+    except (OSError, ValueError) as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+
+    watcher = ReportWatcher(scan_root, options, args.jobs)
+    try:
+        server = make_server(args.listen, watcher)
+    except (OSError, ValueError) as e:
+        print(f"[error] cannot listen on {args.listen}: {e}", file=sys.stderr)
+        return 1
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[serve] {args.listen}", file=sys.stderr)
+    try:
+        start = time.perf_counter()
+        watcher.scan_all()
+        print(f"[scan] {len(watcher.results)} repos in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        while True:
+            time.sleep(args.interval)
+            for repo_path in watcher.rescan():
+                print(f"[rescan] {repo_path}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        if args.listen.startswith('unix:'):
+            try:
+                os.unlink(args.listen[len('unix:'):])
+            except OSError:
+                pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))